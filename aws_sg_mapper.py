@@ -18,7 +18,7 @@ from typing import List, Optional
 
 from aws_client import AWSClient
 from cache_handler import CacheHandler
-from graph_generator import GraphGenerator
+from graph_generator import GraphGenerator, render_many
 from config import DEFAULT_REGION
 from utils import setup_logging, logger
 
@@ -157,10 +157,10 @@ def generate_sg_maps(
     Note:
         Output files are placed in the build directory with appropriate subdirectories
         created as needed. For per-security-group maps, the output filename includes
-        the security group ID.
+        the security group ID. Per-security-group maps are rendered in parallel
+        worker processes.
     """
     logger.info("Generating security group relationship graph(s)...")
-    graph_generator = GraphGenerator()
 
     if output_per_sg:
         # Generate individual maps for each security group
@@ -169,23 +169,20 @@ def generate_sg_maps(
         base_name = os.path.splitext(os.path.basename(base_output))[0]
         ext = os.path.splitext(base_output)[1] or ".png"
 
-        for sg in security_groups:
-            sg_id = sg["GroupId"]
-            sg_name = sg.get("GroupName", "Unknown")
-            output_file = f"{output_dir}/{base_name}_{sg_id}{ext}"
-            title = f"Security Group: {sg_name} ({sg_id})"
-
-            try:
-                logger.debug("Building graph for %s", sg_id)
-                # Build graph focusing on this security group and its relationships
-                graph_generator.build_graph([sg], highlight_sg=sg_id)
-                logger.debug("Generating visualization to %s", output_file)
-                graph_generator.generate_visualization(output_file, title=title)
-                logger.info("Generated map for %s at %s", sg_id, output_file)
-            except Exception as e:
-                logger.error("Failed to generate map for %s: %s", sg_id, str(e))
+        # Each map focuses on one security group and its relationships
+        groups_by_key = {sg["GroupId"]: [sg] for sg in security_groups}
+        titles = {
+            sg["GroupId"]: f"Security Group: {sg.get('GroupName', 'Unknown')} "
+            f"({sg['GroupId']})"
+            for sg in security_groups
+        }
+        logger.debug("Rendering %d maps in parallel", len(groups_by_key))
+        outputs = render_many(groups_by_key, output_dir, base_name, ext, titles)
+        for sg_id, output_file in outputs.items():
+            logger.info("Generated map for %s at %s", sg_id, output_file)
     else:
         # Generate a single map for all security groups
+        graph_generator = GraphGenerator()
         try:
             logger.debug("Building graph structure")
             graph_generator.build_graph(security_groups)
@@ -217,6 +214,9 @@ def main():
     try:
         args = parse_arguments()
         setup_logging(args.debug)
+        # Maps are only saved to files, so default matplotlib to a headless
+        # backend; worker processes inherit it through the environment
+        os.environ.setdefault("MPLBACKEND", "Agg")
         logger.info("Starting AWS Security Group Mapper")
         logger.debug(
             "Arguments: profiles=%s, regions=%s, output=%s, security_group-ids=%s",
@@ -5,7 +5,7 @@ import time
 from pathlib import Path
 from typing import Dict, Optional, List
 
-from config import CACHE_DIR, CACHE_DURATION
+from config import CACHE_DIR, CACHE_DURATION, LAYOUT_CACHE_DIR
 from utils import logger
 
 
@@ -69,4 +69,7 @@ class CacheHandler:
         else:
             for cache_file in self.cache_dir.glob("*_sg_cache.json"):
                 cache_file.unlink()
+            # Persisted graph layouts
+            for layout_file in LAYOUT_CACHE_DIR.glob("*.npz"):
+                layout_file.unlink()
             logger.info("Cleared all cache files")
@@ -118,6 +118,8 @@ config = Config()
 # Export commonly used settings
 CACHE_DIR = Path(config.get("cache", "directory"))
 CACHE_DURATION = config.get("cache", "duration", default=3600)
+LAYOUT_CACHE_DIR = CACHE_DIR / "layouts"
+LAYOUT_CACHE_MAX_FILES = config.get("cache", "max_layouts", default=256)
 DEFAULT_REGION = config.get("aws", "default_region", default="us-east-1")
 MAX_RETRIES = config.get("aws", "max_retries", default=3)
 RETRY_DELAY = config.get("aws", "retry_delay", default=5)
@@ -1,12 +1,16 @@
 """Graph generator module for AWS Security Group visualization."""
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional
 
 from config import config
 from visualizers import BaseVisualizer, MatplotlibVisualizer, PlotlyVisualizer
 from utils import logger
 
+# Below this many maps, rendering inline beats starting worker processes
+_MIN_PARALLEL_JOBS = 8
+
 
 class GraphGenerator:
     """Generator class for creating and managing security group graphs."""
@@ -39,12 +43,18 @@ class GraphGenerator:
 
     def generate_visualization(
         self, output_path: str, title: Optional[str] = None
-    ) -> None:
+    ) -> Optional[str]:
         """Generate and save the visualization using the configured visualizer.
 
+        Relative paths are placed under ``build/maps``, and the visualizer may
+        change the extension or compress the file.
+
         Args:
             output_path: Path where the visualization should be saved
             title: Optional title for the visualization
+
+        Returns:
+            Optional[str]: Path of the written file, None for an empty graph
         """
         # Ensure the base output directory exists
         maps_dir = os.path.join("build", "maps")
@@ -65,4 +75,91 @@ class GraphGenerator:
                 output_path = output_path.rsplit(".", 1)[0] + ".html"
 
         logger.debug("Generating visualization to %s", output_path)
-        self.visualizer.generate_visualization(output_path, title)
+        return self.visualizer.generate_visualization(output_path, title)
+
+
+def _render_job(
+    key: str, security_groups: List[Dict], output_file: str, title: Optional[str]
+) -> Optional[str]:
+    """Build and render a single map.
+
+    Runs inside a worker process, so the generator (and its plotting backend
+    state) is created there rather than pickled from the parent.
+
+    Args:
+        key: Security group ID to highlight
+        security_groups: Security groups to include in the map
+        output_file: Path where the visualization should be saved
+        title: Optional title for the visualization
+
+    Returns:
+        Optional[str]: Path of the written file, None for an empty graph
+    """
+    generator = GraphGenerator()
+    generator.build_graph(security_groups, highlight_sg=key)
+    return generator.generate_visualization(output_file, title=title)
+
+
+def render_many(
+    groups_by_key: Dict[str, List[Dict]],
+    out_dir: str,
+    base_name: str = "sg_map",
+    ext: str = ".png",
+    titles: Optional[Dict[str, str]] = None,
+    *,
+    max_workers: Optional[int] = None,
+) -> Dict[str, str]:
+    """Render one map per key, in parallel worker processes.
+
+    Each map is independent, so rendering scales with the number of cores.
+    Per-security-group maps are usually small, though, and starting a worker
+    and pickling its job can cost more than rendering the map. Fewer than
+    ``_MIN_PARALLEL_JOBS`` maps are therefore rendered inline, as are all
+    maps when a single worker is configured.
+
+    Args:
+        groups_by_key: Mapping of security group ID to the groups in its map
+        out_dir: Directory for the generated files
+        base_name: File name prefix; the key is appended to it
+        ext: File extension for the generated files
+        titles: Optional mapping of key to visualization title
+        max_workers: Worker process count (default: ``visualization.render_workers``,
+            or the number of CPUs when that is 0)
+
+    Returns:
+        Dict[str, str]: Mapping of each successfully rendered key to the path
+        of the file that was written
+    """
+    titles = titles or {}
+    jobs = {
+        key: (key, groups, f"{out_dir}/{base_name}_{key}{ext}", titles.get(key))
+        for key, groups in groups_by_key.items()
+    }
+    max_workers = max_workers or config.get(
+        "visualization", "render_workers", default=0
+    )
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    rendered = {}
+
+    if workers <= 1 or len(jobs) < _MIN_PARALLEL_JOBS:
+        for key, job in jobs.items():
+            try:
+                output_file = _render_job(*job)
+            except Exception as e:
+                logger.error("Failed to generate map for %s: %s", key, str(e))
+            else:
+                if output_file is not None:
+                    rendered[key] = output_file
+        return rendered
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(_render_job, *job) for key, job in jobs.items()}
+        for key, future in futures.items():
+            try:
+                output_file = future.result()
+            except Exception as e:
+                logger.error("Failed to generate map for %s: %s", key, str(e))
+            else:
+                if output_file is not None:
+                    rendered[key] = output_file
+    return rendered
@@ -0,0 +1,150 @@
+"""Tests for collapsing equivalent security groups."""
+
+import logging
+
+import pytest
+
+from visualizers import MatplotlibVisualizer, PlotlyVisualizer
+
+
+def _worker(group_id: str) -> dict:
+    """A security group allowing SSH from the same CIDR as its siblings."""
+    return {
+        "GroupId": group_id,
+        "GroupName": f"worker-{group_id}",
+        "VpcId": "vpc-001",
+        "IpPermissions": [
+            {
+                "FromPort": 22,
+                "ToPort": 22,
+                "IpProtocol": "tcp",
+                "IpRanges": [{"CidrIp": "10.0.0.0/8"}],
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def security_groups():
+    """Three equivalent workers and one group referencing them."""
+    return [_worker("sg-w1"), _worker("sg-w2"), _worker("sg-w3")] + [
+        {
+            "GroupId": "sg-db",
+            "GroupName": "db",
+            "VpcId": "vpc-001",
+            "IpPermissions": [
+                {
+                    "FromPort": 5432,
+                    "ToPort": 5432,
+                    "IpProtocol": "tcp",
+                    "UserIdGroupPairs": [
+                        {"GroupId": "sg-w1", "VpcId": "vpc-001"},
+                        {"GroupId": "sg-w2", "VpcId": "vpc-001"},
+                        {"GroupId": "sg-w3", "VpcId": "vpc-001"},
+                    ],
+                }
+            ],
+        }
+    ]
+
+
+def _assert_frozen(viz: PlotlyVisualizer) -> None:
+    """The render arrays describe the current graph."""
+    assert viz._node_ids == list(viz.graph)
+    edges = [
+        (viz._node_ids[u], viz._node_ids[v])
+        for u, v in zip(viz._edge_src, viz._edge_dst)
+    ]
+    assert edges == list(viz.graph.edges)
+    assert viz._edge_label == [d["label"] for _, _, d in viz.graph.edges(data=True)]
+    assert set(viz._sg_nodes) == {
+        n for n, d in viz.graph.nodes(data=True) if d["type"] == "security_group"
+    }
+
+
+def test_aggregate_merges_equivalent_groups(security_groups):
+    """Equivalent groups become one counted node with merged edges."""
+    viz = PlotlyVisualizer()
+    viz.aggregate_threshold = 0
+    viz.build_graph(security_groups)
+    full_graph = viz.graph
+
+    assert viz.aggregate_graph()
+
+    assert viz._full_graph is full_graph
+    (cidr,) = viz._cidr_nodes
+    assert set(viz.graph) == {"sg-w1", "sg-db", cidr}
+    assert viz.graph.nodes["sg-w1"]["count"] == 3
+    assert viz.graph.nodes["sg-w1"]["name"] == "worker-sg-w1 (+2 similar)"
+    assert viz.graph[cidr]["sg-w1"]["count"] == 3
+    assert viz.graph["sg-w1"]["sg-db"]["count"] == 3
+    _assert_frozen(viz)
+
+
+def test_aggregate_again_keeps_original_names(security_groups):
+    """Aggregating twice neither merges further nor stacks name suffixes."""
+    viz = PlotlyVisualizer()
+    viz.aggregate_threshold = 0
+    viz.build_graph(security_groups)
+    viz.aggregate_graph()
+
+    assert not viz.aggregate_graph()
+    assert viz.graph.nodes["sg-w1"]["name"] == "worker-sg-w1 (+2 similar)"
+
+
+def test_highlighted_group_is_not_merged(security_groups):
+    """The highlighted group stays a node of its own."""
+    viz = PlotlyVisualizer()
+    viz.aggregate_threshold = 0
+    viz.build_graph(security_groups, highlight_sg="sg-w2")
+
+    assert viz.aggregate_graph()
+
+    assert {"sg-w1", "sg-w2"} <= set(viz.graph)
+    assert "sg-w3" not in viz.graph
+    assert viz.graph.nodes["sg-w1"]["count"] == 2
+
+
+def test_build_graph_aggregates_above_threshold(security_groups):
+    """Building a graph above the threshold aggregates and freezes it."""
+    viz = PlotlyVisualizer()
+    viz.aggregate_threshold = 1
+    viz.build_graph(security_groups)
+
+    assert viz._full_graph is not None
+    assert len(viz.graph) == 3
+    _assert_frozen(viz)
+
+
+def test_aggregation_is_logged(security_groups, caplog):
+    """Merging groups is reported at info level, with the opt-out."""
+    caplog.set_level(logging.INFO)
+    viz = PlotlyVisualizer()
+    viz.aggregate_threshold = 1
+    viz.build_graph(security_groups)
+
+    assert "Merged 3 equivalent security groups into 1 nodes" in caplog.text
+    assert "aggregate_threshold to 0" in caplog.text
+
+
+def test_matplotlib_sizes_merged_nodes_by_count(security_groups):
+    """A merged node covers the area of all the groups it stands for."""
+    import matplotlib.pyplot as plt
+
+    viz = MatplotlibVisualizer()
+    viz.aggregate_threshold = 1
+    viz.build_graph(security_groups)
+    viz.pos = {node: (i, 0) for i, node in enumerate(viz.graph)}
+    plt.figure()
+    try:
+        viz._draw_nodes()
+        sizes = plt.gca().collections[0].get_sizes()
+    finally:
+        plt.close("all")
+
+    expected = [
+        viz.node_size * 1.2 * viz.graph.nodes[node].get("count", 1)
+        for node in viz._sg_nodes
+    ]
+    assert list(sizes) == pytest.approx(expected)
+    assert max(sizes) == pytest.approx(3 * min(sizes))
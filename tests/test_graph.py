@@ -0,0 +1,38 @@
+"""Tests for building the security group graph."""
+
+from visualizers import PlotlyVisualizer
+
+
+def _rule(protocol: str, port: int, **group_pair) -> dict:
+    """A rule on ``port`` allowing traffic from security group ``sg-src``."""
+    return {
+        "FromPort": port,
+        "ToPort": port,
+        "IpProtocol": protocol,
+        "UserIdGroupPairs": [{"GroupId": "sg-src", **group_pair}],
+    }
+
+
+def test_rules_between_the_same_groups_share_one_edge():
+    """Distinct labels are joined, ports are deduplicated, cross-VPC wins."""
+    viz = PlotlyVisualizer()
+    viz.build_graph(
+        [
+            {
+                "GroupId": "sg-dns",
+                "GroupName": "dns",
+                "VpcId": "vpc-001",
+                "IpPermissions": [
+                    _rule("tcp", 53),
+                    _rule("udp", 53, VpcId="vpc-002"),
+                    _rule("udp", 53, VpcId="vpc-002"),
+                ],
+            }
+        ]
+    )
+
+    edge = viz.graph["sg-src"]["sg-dns"]
+    assert edge["label"].split(", ") == ["tcp:53", "udp:53"]
+    assert edge["ports"] == "53-53"
+    assert edge["is_cross_vpc"]
+    assert viz._edge_is_cross_vpc.tolist() == [True]
@@ -0,0 +1,49 @@
+"""Tests for rendering maps through the graph generator."""
+
+import os
+
+import pytest
+
+from graph_generator import GraphGenerator, render_many
+from tests.mock_data.security_groups import get_mock_security_groups
+from visualizers import PlotlyVisualizer
+from visualizers import base
+
+
+@pytest.fixture(autouse=True)
+def plotly_engine(tmp_path, monkeypatch):
+    """Render with Plotly, keeping layouts and output out of the checkout."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(base, "LAYOUT_CACHE_DIR", tmp_path / "layouts")
+    monkeypatch.setattr(base.BaseVisualizer, "_pos_cache", {})
+    monkeypatch.setattr(
+        GraphGenerator, "_get_visualizer", lambda self: PlotlyVisualizer()
+    )
+
+
+def test_render_many_inline_returns_written_paths(tmp_path):
+    """Each key maps to the file actually written, not the requested name."""
+    groups = get_mock_security_groups()[:2]
+
+    rendered = render_many(
+        {sg["GroupId"]: [sg] for sg in groups}, str(tmp_path), max_workers=1
+    )
+
+    assert sorted(rendered) == ["sg-001", "sg-002"]
+    for key, output_file in rendered.items():
+        assert os.path.basename(output_file).startswith(f"sg_map_{key}.html")
+        assert os.path.exists(output_file)
+
+
+def test_render_many_isolates_failing_keys(tmp_path, caplog):
+    """A map that fails to render does not stop the others."""
+    sg = get_mock_security_groups()[0]
+
+    rendered = render_many(
+        {"sg-001": [sg], "sg-broken": [{"GroupName": "no group ID"}]},
+        str(tmp_path),
+        max_workers=1,
+    )
+
+    assert list(rendered) == ["sg-001"]
+    assert "Failed to generate map for sg-broken" in caplog.text
@@ -0,0 +1,155 @@
+"""Tests for the force-directed layouts in visualizers.layout."""
+
+import networkx as nx
+import numpy as np
+import pytest
+from scipy.spatial.distance import pdist
+
+from visualizers import PlotlyVisualizer
+from visualizers.layout import (
+    _coarsen,
+    _edge_arrays,
+    barnes_hut_layout,
+    igraph_layout,
+    lbfgs_layout,
+    multilevel_layout,
+)
+
+LAYOUTS = [lbfgs_layout, barnes_hut_layout, multilevel_layout, igraph_layout]
+
+
+def _assert_valid_layout(graph: nx.Graph, pos: dict) -> None:
+    """Every node has a finite 2D position."""
+    assert set(pos) == set(graph)
+    coords = np.array([pos[node] for node in graph], dtype=float).reshape(-1, 2)
+    assert np.isfinite(coords).all()
+
+
+def _self_loops() -> nx.DiGraph:
+    """A cycle whose nodes all allow traffic from themselves."""
+    graph = nx.cycle_graph(6, create_using=nx.DiGraph)
+    graph.add_edges_from((node, node) for node in list(graph))
+    return graph
+
+
+GRAPHS = {
+    "empty": nx.DiGraph,
+    "single": lambda: nx.empty_graph(1, create_using=nx.DiGraph),
+    "pair": lambda: nx.path_graph(2, create_using=nx.DiGraph),
+    "isolated": lambda: nx.empty_graph(5, create_using=nx.DiGraph),
+    "disconnected": lambda: nx.DiGraph(
+        nx.disjoint_union_all([nx.complete_graph(4), nx.path_graph(30)])
+    ),
+    "self_loops": _self_loops,
+    "only_self_loop": lambda: nx.DiGraph([(0, 0)]),
+}
+
+
+@pytest.mark.parametrize("layout", LAYOUTS, ids=lambda f: f.__name__)
+@pytest.mark.parametrize("name", GRAPHS)
+def test_layout_shapes(layout, name):
+    """Every layout places every node at a finite position."""
+    if layout is igraph_layout:
+        pytest.importorskip("igraph")
+    graph = GRAPHS[name]()
+    pos = layout(graph, k=2, iterations=20, seed=0)
+    _assert_valid_layout(graph, pos)
+    if len(graph) > 1:
+        coords = np.array(list(pos.values()))
+        assert np.abs(coords).max() == pytest.approx(1)
+
+
+# igraph draws its displacements from its own generator, only the start is seeded
+@pytest.mark.parametrize("layout", LAYOUTS[:3], ids=lambda f: f.__name__)
+def test_layout_is_deterministic(layout):
+    """The same seed gives the same layout."""
+    graph = GRAPHS["disconnected"]()
+    first = layout(graph, k=2, seed=3)
+    second = layout(graph, k=2, seed=3)
+    for node in graph:
+        np.testing.assert_allclose(first[node], second[node])
+
+
+@pytest.mark.parametrize("layout", [lbfgs_layout, barnes_hut_layout])
+def test_layout_accepts_initial_positions(layout):
+    """Initial positions seed the layouts that take them."""
+    graph = GRAPHS["disconnected"]()
+    start = nx.circular_layout(graph)
+    _assert_valid_layout(graph, layout(graph, k=2, pos=start, iterations=5))
+
+
+def test_edge_arrays_drop_self_loops_and_direction():
+    """Each undirected edge appears once and self-loops are dropped."""
+    graph = nx.DiGraph([(0, 1), (1, 0), (1, 2), (2, 2)])
+    rows, cols = _edge_arrays(graph)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_coarsen_merges_a_matching(seed):
+    """Coarse nodes are numbered densely and merge at most two adjacent nodes."""
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(10, 10))
+    rows, cols = _edge_arrays(graph)
+    mapping, coarse_size = _coarsen(len(graph), rows, cols, np.random.default_rng(seed))
+    assert set(mapping.tolist()) == set(range(coarse_size))
+    members = np.bincount(mapping, minlength=coarse_size)
+    assert members.max() <= 2
+    for coarse in np.flatnonzero(members == 2):
+        assert graph.has_edge(*np.flatnonzero(mapping == coarse).tolist())
+
+
+def test_coarsen_without_edges_keeps_every_node():
+    """Nodes without edges have nothing to merge with."""
+    mapping, coarse_size = _coarsen(
+        4,
+        np.array([], dtype=np.intp),
+        np.array([], dtype=np.intp),
+        np.random.default_rng(0),
+    )
+    assert coarse_size == 4
+    assert sorted(mapping.tolist()) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("n", range(1, 9))
+@pytest.mark.parametrize("seed", range(20))
+def test_barnes_hut_tiny_graphs(n, seed):
+    """Tiny graphs leave neighbour cells off the grid without crashing."""
+    graph = nx.gnp_random_graph(n, 0.5, seed=seed, directed=True)
+    _assert_valid_layout(graph, barnes_hut_layout(graph, k=2, seed=seed))
+
+
+@pytest.mark.parametrize("n", range(1, 9))
+@pytest.mark.parametrize("seed", range(20))
+def test_multilevel_tiny_graphs(n, seed):
+    """Graphs below the coarsening floor are laid out on the coarsest level."""
+    graph = nx.gnp_random_graph(n, 0.5, seed=seed, directed=True)
+    _assert_valid_layout(graph, multilevel_layout(graph, k=2, seed=seed))
+
+
+def test_multilevel_coarsens_to_small_level():
+    """A coarsened graph ends on a small coarsest level and still lays out."""
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(15, 15))
+    rows, cols = _edge_arrays(graph)
+    mapping, coarse_size = _coarsen(len(graph), rows, cols, np.random.default_rng(0))
+    assert coarse_size < len(graph)
+    assert mapping.shape == (len(graph),)
+    assert mapping.max() == coarse_size - 1
+    _assert_valid_layout(graph, multilevel_layout(graph, k=2, seed=0))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_multilevel_tiny_coarsest_level(monkeypatch, seed):
+    """Coarsening all the way down to a handful of nodes still lays out."""
+    monkeypatch.setattr("visualizers.layout._MIN_COARSE_NODES", 2)
+    graph = nx.random_labeled_tree(200, seed=seed)
+    _assert_valid_layout(graph, multilevel_layout(graph, k=2, seed=seed))
+
+
+def test_spectral_seed_separates_small_components():
+    """Nodes sharing a spectral position are pulled apart by the jitter."""
+    triangles = [nx.complete_graph(3)] * 50
+    viz = PlotlyVisualizer()
+    viz.graph = nx.DiGraph(nx.disjoint_union_all(triangles + [nx.path_graph(500)]))
+    pos = viz._run_layout(k=2)
+    _assert_valid_layout(viz.graph, pos)
+    assert pdist(np.array(list(pos.values()))).min() > 0
@@ -0,0 +1,196 @@
+"""Tests for the persisted layout cache."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import cache_handler
+from cache_handler import CacheHandler
+from tests.mock_data.security_groups import get_mock_security_groups
+from visualizers import PlotlyVisualizer
+from visualizers import base
+
+
+@pytest.fixture
+def layout_dir(tmp_path, monkeypatch):
+    """Point the layout cache at a temporary directory."""
+    directory = tmp_path / "layouts"
+    monkeypatch.setattr(base, "LAYOUT_CACHE_DIR", directory)
+    monkeypatch.setattr(cache_handler, "LAYOUT_CACHE_DIR", directory)
+    return directory
+
+
+@pytest.fixture
+def visualizer():
+    """A visualizer holding the mock inventory."""
+    viz = PlotlyVisualizer()
+    viz.build_graph(get_mock_security_groups())
+    return viz
+
+
+def test_save_and_load_layout_round_trip(layout_dir, visualizer):
+    """A saved layout loads back with the same positions."""
+    rng = np.random.default_rng(0)
+    pos = {node: rng.uniform(-1, 1, 2) for node in visualizer.graph}
+    visualizer._save_layout("key", pos)
+
+    loaded = visualizer._load_layout("key")
+
+    assert set(loaded) == set(pos)
+    for node, xy in pos.items():
+        np.testing.assert_array_equal(loaded[node], xy)
+
+
+def test_load_layout_rejects_other_topology(layout_dir, visualizer):
+    """Layouts of a different node set, or missing ones, are not used."""
+    nodes = list(visualizer.graph)
+    visualizer._save_layout("key", {node: np.zeros(2) for node in nodes[1:]})
+
+    assert visualizer._load_layout("key") is None
+    assert visualizer._load_layout("missing") is None
+
+
+def test_load_layout_ignores_truncated_file(layout_dir, visualizer):
+    """A partially written layout is treated as missing."""
+    visualizer._save_layout("key", {node: np.zeros(2) for node in visualizer.graph})
+    path = layout_dir / "key.npz"
+    path.write_bytes(path.read_bytes()[: path.stat().st_size // 2])
+
+    assert visualizer._load_layout("key") is None
+
+
+def test_save_layout_leaves_only_the_layout(layout_dir, visualizer):
+    """The temporary file a layout is written to is moved into place."""
+    visualizer._save_layout("key", {node: np.zeros(2) for node in visualizer.graph})
+
+    assert [p.name for p in layout_dir.iterdir()] == ["key.npz"]
+
+
+def test_compute_layout_reuses_persisted_layout(layout_dir, visualizer, monkeypatch):
+    """A layout persisted by one run is loaded instead of recomputed."""
+    monkeypatch.setattr(base.BaseVisualizer, "_pos_cache", {})
+    first = visualizer.compute_layout(k=2, seed=0)
+    base.BaseVisualizer._pos_cache.clear()
+
+    def run_layout(**layout_kwargs):
+        raise AssertionError("layout was recomputed")
+
+    visualizer._run_layout = run_layout
+    second = visualizer.compute_layout(k=2, seed=0)
+
+    for node, xy in first.items():
+        np.testing.assert_allclose(second[node], xy)
+
+
+def test_prune_keeps_most_recent_layouts(layout_dir, visualizer, monkeypatch):
+    """Saving beyond the limit drops the least recently used layouts."""
+    monkeypatch.setattr(base, "LAYOUT_CACHE_MAX_FILES", 3)
+    pos = {node: np.zeros(2) for node in visualizer.graph}
+    for i in range(5):
+        visualizer._save_layout(f"key{i}", pos)
+        os.utime(layout_dir / f"key{i}.npz", (i, i))
+
+    visualizer._save_layout("key5", pos)
+
+    assert sorted(p.name for p in layout_dir.iterdir()) == [
+        "key3.npz",
+        "key4.npz",
+        "key5.npz",
+    ]
+
+
+def test_prune_skips_layouts_removed_concurrently(
+    layout_dir, visualizer, monkeypatch, caplog
+):
+    """A layout deleted by another render while pruning does not fail the save."""
+    monkeypatch.setattr(base, "LAYOUT_CACHE_MAX_FILES", 1)
+    pos = {node: np.zeros(2) for node in visualizer.graph}
+    visualizer._save_layout("key0", pos)
+    stat = Path.stat
+
+    def stat_vanished(path, *args, **kwargs):
+        if path.name == "key0.npz":
+            raise FileNotFoundError(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "stat", stat_vanished)
+    visualizer._save_layout("key1", pos)
+
+    assert (layout_dir / "key1.npz").exists()
+    assert "Error saving layout cache" not in caplog.text
+
+
+def test_clear_cache_removes_layouts(layout_dir, visualizer, tmp_path):
+    """Clearing all caches also removes persisted layouts."""
+    visualizer._save_layout("key", {node: np.zeros(2) for node in visualizer.graph})
+
+    handler = CacheHandler()
+    handler.cache_dir = tmp_path
+    handler.clear_cache()
+
+    assert not list(layout_dir.iterdir())
+
+
+@pytest.mark.parametrize("algorithm", ["barnes_hut", "multilevel"])
+def test_warm_start_only_for_seeded_layouts(layout_dir, visualizer, algorithm):
+    """Layouts that ignore initial positions keep their full iterations."""
+    visualizer.layout_algorithm = algorithm
+    visualizer._last_layout = {node: np.zeros(2) for node in visualizer.graph}
+    calls = []
+
+    def run_layout(**layout_kwargs):
+        calls.append(layout_kwargs)
+        return {node: np.zeros(2) for node in visualizer.graph}
+
+    visualizer._run_layout = run_layout
+    visualizer.compute_layout(k=2, iterations=50)
+
+    if algorithm == "multilevel":
+        assert calls == [{"k": 2, "iterations": 50}]
+    else:
+        assert "pos" in calls[0]
+        assert calls[0]["iterations"] < 50
+
+
+def test_no_warm_start_for_default_multilevel_layout(
+    layout_dir, visualizer, monkeypatch
+):
+    """Large graphs on the default layout keep the multilevel cold layout."""
+    monkeypatch.setattr(base, "_MULTILEVEL_LAYOUT_THRESHOLD", 1)
+    monkeypatch.setattr(base.BaseVisualizer, "_pos_cache", {})
+    visualizer._last_layout = {node: np.zeros(2) for node in visualizer.graph}
+    calls = []
+
+    def run_layout(**layout_kwargs):
+        calls.append(layout_kwargs)
+        return {node: np.zeros(2) for node in visualizer.graph}
+
+    visualizer._run_layout = run_layout
+    visualizer.compute_layout(k=2, iterations=50)
+
+    assert visualizer.layout_algorithm == "spring"
+    assert calls == [{"k": 2, "iterations": 50}]
+
+
+def test_warm_started_layout_is_not_persisted(layout_dir, visualizer, monkeypatch):
+    """Only cold layouts are saved, so a cold cache reproduces them."""
+    monkeypatch.setattr(base.BaseVisualizer, "_pos_cache", {})
+    visualizer.layout_algorithm = "barnes_hut"
+    visualizer._last_layout = {node: np.zeros(2) for node in visualizer.graph}
+
+    visualizer.compute_layout(k=2, iterations=5, seed=0)
+
+    assert not layout_dir.exists() or not list(layout_dir.iterdir())
+
+
+def test_warm_start_is_deterministic_without_seed(visualizer):
+    """New nodes get the same initial position on every run."""
+    new_node, *kept = list(visualizer.graph)
+    visualizer._last_layout = {node: np.zeros(2) for node in kept}
+
+    first = visualizer._warm_start()
+    second = visualizer._warm_start()
+
+    np.testing.assert_array_equal(first[new_node], second[new_node])
@@ -0,0 +1,57 @@
+"""Tests for the matplotlib renderer."""
+
+import pytest
+
+from visualizers import MatplotlibVisualizer
+
+
+def _security_groups(count: int) -> list:
+    """Groups that each allow SSH from the next one."""
+    return [
+        {
+            "GroupId": f"sg-{i}",
+            "GroupName": f"group-{i}",
+            "VpcId": "vpc-001",
+            "IpPermissions": [
+                {
+                    "FromPort": 22,
+                    "ToPort": 22,
+                    "IpProtocol": "tcp",
+                    "UserIdGroupPairs": [{"GroupId": f"sg-{(i + 1) % count}"}],
+                }
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("max_edge_labels, expected", [(0, 60), (100, 60), (50, 0)])
+def test_edge_labels_only_dropped_when_capped(max_edge_labels, expected):
+    """A PNG keeps every rule label unless a cap is configured and exceeded."""
+    import matplotlib.pyplot as plt
+
+    viz = MatplotlibVisualizer()
+    viz.max_edge_labels = max_edge_labels
+    viz.build_graph(_security_groups(60))
+    # Place the nodes directly, so no layout is computed or cached
+    viz.pos = {node: (i, 0) for i, node in enumerate(viz.graph)}
+    plt.figure()
+    try:
+        viz._draw_edges()
+    finally:
+        plt.close("all")
+
+    assert len(viz._edge_labels) == expected
+
+
+def test_init_leaves_global_matplotlib_settings_alone():
+    """Creating a visualizer changes neither the backend nor rcParams."""
+    import matplotlib
+
+    backend = matplotlib.get_backend()
+    rc_params = dict(matplotlib.rcParams)
+
+    MatplotlibVisualizer()
+
+    assert matplotlib.get_backend() == backend
+    assert dict(matplotlib.rcParams) == rc_params
@@ -0,0 +1,177 @@
+"""Tests for the figure JSON written by the Plotly renderer."""
+
+import base64
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from tests.mock_data.security_groups import get_mock_security_groups
+from visualizers import PlotlyVisualizer
+from visualizers import base, plotly_visualizer
+from visualizers.base import COLORS
+
+
+@pytest.fixture(autouse=True)
+def layout_cache(tmp_path, monkeypatch):
+    """Keep layouts out of the real cache and the shared in-memory cache."""
+    monkeypatch.setattr(base, "LAYOUT_CACHE_DIR", tmp_path / "layouts")
+    monkeypatch.setattr(base.BaseVisualizer, "_pos_cache", {})
+
+
+def _visualizer(highlight_sg=None) -> PlotlyVisualizer:
+    """A visualizer holding the mock inventory, written uncompressed."""
+    viz = PlotlyVisualizer()
+    viz.compress_html = False
+    viz.build_graph(get_mock_security_groups(), highlight_sg)
+    return viz
+
+
+def _figure(path: str) -> dict:
+    """Read the figure JSON back out of a written page."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        page = f.read()
+    start = page.index("var figure = ") + len("var figure = ")
+    return json.loads(page[start : page.index(";\nfigure.config", start)])
+
+
+def _render(viz: PlotlyVisualizer, tmp_path) -> dict:
+    """Render the visualizer and return the traces of its figure."""
+    return _figure(viz.generate_visualization(str(tmp_path / "map.html")))["data"]
+
+
+def _decode(value):
+    """Decode a plotly.js typed array, or normalize a JSON list, to an array."""
+    if isinstance(value, dict):
+        raw = base64.b64decode(value["bdata"])
+        return np.frombuffer(raw, dtype=np.dtype(value["dtype"]))
+    return np.array([np.nan if v is None else v for v in value])
+
+
+def _edge_traces(traces: list) -> tuple:
+    """Split the edge traces into line and arrow traces."""
+    lines = [t for t in traces if t["mode"] == "lines"]
+    arrows = [t for t in traces if t["mode"] == "markers"]
+    return lines, arrows
+
+
+def _normalize(value):
+    """Decode typed arrays in a trace so differently encoded figures compare."""
+    if isinstance(value, dict):
+        if "bdata" in value:
+            return _decode(value).astype(np.float64).tolist()
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def test_typed_arrays_round_trip_with_nan():
+    """Encoded arrays decode to the same values, NaN gaps included."""
+    values = np.array([0.5, -1.25, np.nan, 3.0], dtype=np.float32)
+
+    encoded = plotly_visualizer._typed_arrays(
+        {"x": values, "marker": {"angle": values}}
+    )
+
+    assert encoded["x"]["dtype"] == "f4"
+    np.testing.assert_array_equal(_decode(encoded["x"]), values)
+    np.testing.assert_array_equal(_decode(encoded["marker"]["angle"]), values)
+
+
+def test_edge_lines_hold_endpoints_separated_by_nan(tmp_path):
+    """Each edge is (source, target, NaN) in the decoded line arrays."""
+    viz = _visualizer()
+    traces = _render(viz, tmp_path)
+    _, coords = viz.layout_arrays(viz.compute_layout(k=2))
+    lines, _ = _edge_traces(traces)
+
+    segments = 0
+    for trace, is_cross in zip(lines, (False, True)):
+        mask = viz._edge_is_cross_vpc == is_cross
+        xs = _decode(trace["x"]).reshape(-1, 3)
+        ys = _decode(trace["y"]).reshape(-1, 3)
+        assert np.isnan(xs[:, 2]).all() and np.isnan(ys[:, 2]).all()
+        np.testing.assert_array_equal(xs[:, 0], coords[viz._edge_src[mask], 0])
+        np.testing.assert_array_equal(ys[:, 1], coords[viz._edge_dst[mask], 1])
+        segments += len(xs)
+    assert segments == viz.graph.number_of_edges()
+
+
+def test_hover_data_lines_up_with_edges(tmp_path):
+    """Every arrow carries the names and rule of its own edge."""
+    viz = _visualizer()
+    traces = _render(viz, tmp_path)
+    _, arrows = _edge_traces(traces)
+    names = dict(viz.graph.nodes(data="name"))
+
+    for trace, is_cross in zip(arrows, (False, True)):
+        expected = [
+            [names[u], names[v], data["label"]]
+            for u, v, data in viz.graph.edges(data=True)
+            if data["is_cross_vpc"] == is_cross
+        ]
+        assert trace["customdata"] == expected
+        assert len(_decode(trace["x"])) == len(expected)
+        assert "%{customdata[2]}" in trace["hovertemplate"]
+    assert "Cross-VPC" in arrows[1]["hovertemplate"]
+
+
+@pytest.mark.parametrize(
+    "gl_threshold, trace_type", [(10000, "scatter"), (0, "scattergl")]
+)
+def test_webgl_above_threshold(tmp_path, gl_threshold, trace_type):
+    """Traces switch to scattergl once the graph exceeds gl_threshold."""
+    viz = _visualizer()
+    viz.gl_threshold = gl_threshold
+
+    traces = _render(viz, tmp_path)
+
+    assert {trace["type"] for trace in traces} == {trace_type}
+
+
+def test_highlighted_group_gets_its_color_and_size(tmp_path):
+    """The highlighted group is styled per point in the security group trace."""
+    viz = _visualizer(highlight_sg="sg-002")
+    traces = _render(viz, tmp_path)
+    (sg_trace,) = [t for t in traces if t.get("name") == "Security Groups"]
+    index = viz._sg_nodes.index("sg-002")
+
+    colors = sg_trace["marker"]["color"]
+    sizes = _decode(sg_trace["marker"]["size"])
+    assert colors[index] == COLORS["highlighted"]
+    assert colors.count(COLORS["highlighted"]) == 1
+    assert sizes[index] == pytest.approx(1.25 * viz.node_size)
+    assert np.delete(sizes, index) == pytest.approx(viz.node_size)
+
+
+def test_validated_path_writes_the_same_figure(tmp_path, monkeypatch):
+    """go.Scatter traces and plain dict traces produce the same figure."""
+    fast = _render(_visualizer(highlight_sg="sg-002"), tmp_path)
+    monkeypatch.setattr(plotly_visualizer, "FAST", False)
+    validated = _render(_visualizer(highlight_sg="sg-002"), tmp_path)
+
+    assert len(fast) == len(validated)
+    for fast_trace, validated_trace in zip(fast, validated):
+        fast_trace = _normalize(fast_trace)
+        validated_trace = _normalize(validated_trace)
+        for key in ("x", "y"):
+            np.testing.assert_allclose(
+                _decode(fast_trace.pop(key)), _decode(validated_trace.pop(key))
+            )
+        assert fast_trace == validated_trace
+
+
+def test_compressed_page_is_readable(tmp_path):
+    """compress_html writes a gzip page holding the same figure."""
+    viz = _visualizer()
+    viz.compress_html = True
+
+    output_file = viz.generate_visualization(str(tmp_path / "map.html"))
+
+    assert output_file == str(tmp_path / "map.html.gz")
+    with gzip.open(output_file, "rt", encoding="utf-8") as f:
+        assert f.read().startswith("<!doctype html>")
+    assert len(_figure(output_file)["data"]) == len(_render(_visualizer(), tmp_path))
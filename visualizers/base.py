@@ -1,24 +1,138 @@
 """Base visualizer class for AWS Security Group Mapper."""
 
+import hashlib
+import os
+import sys
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import networkx as nx
-from utils import format_ports, get_friendly_cidr_name
+import numpy as np
+from config import LAYOUT_CACHE_DIR, LAYOUT_CACHE_MAX_FILES, config
+from utils import format_ports, get_friendly_cidr_name, logger
+from .layout import (
+    barnes_hut_layout,
+    igraph_layout,
+    lbfgs_layout,
+    multilevel_layout,
+)
 
+# Edge label and port range for the common "all traffic" rule
+_ALL_TRAFFIC_LABEL = "-1:-1"
+_ALL_TRAFFIC_PORTS = "-1--1"
+# Shared stand-in for missing rule lists, so no empty list is built per rule
+_EMPTY: Tuple = ()
 
-class BaseVisualizer(ABC):
+# Palette shared by the visualizers, read-only so renderers cannot drift apart
+COLORS = MappingProxyType(
+    {
+        "security_group": "#5B9BD5",
+        "highlighted": "#FF6B6B",
+        "cidr": "#70AD47",
+        "same_vpc_edge": "#404040",
+        "cross_vpc_edge": "#FF6B6B",
+    }
+)
+
+# Graphs at least this large get a spectral initial layout (sparse, SciPy)
+_SPECTRAL_INIT_THRESHOLD = 500
+# Spread of the noise that separates nodes sharing a spectral position
+_SPECTRAL_JITTER = 1e-3
+# Above this many nodes the layout minimizes the FR energy with L-BFGS
+_LBFGS_LAYOUT_THRESHOLD = 500
+# ...and above this many it coarsens the graph and refines level by level
+_MULTILEVEL_LAYOUT_THRESHOLD = 2000
+# A new topology sharing this fraction of nodes with the previous layout is
+# refined from it for a few iterations instead of laid out from scratch
+_WARM_START_OVERLAP = 0.8
+_WARM_START_ITERATIONS = 20
+# Layouts selectable with visualization.layout besides the default "spring"
+_LAYOUTS = {
+    "barnes_hut": barnes_hut_layout,
+    "igraph": igraph_layout,
+    "multilevel": multilevel_layout,
+}
+
+
+@lru_cache(maxsize=4096)
+def _cidr_node_label(cidr: str) -> Tuple[str, str]:
+    """Return the friendly name and graph node ID for a CIDR block.
+
+    The same CIDRs (0.0.0.0/0, VPC ranges) appear across many rules, so the
+    lookup and formatting are cached. Node IDs are interned so graph lookups
+    compare them by identity.
+    """
+    name = get_friendly_cidr_name(cidr)
+    return name, sys.intern(f"CIDR: {name}")
+
+
+@lru_cache(maxsize=4096)
+def _rule_labels(protocol: str, from_port: int, to_port: int) -> Tuple[str, str]:
+    """Return the edge label and port range for a permission rule.
+
+    Inventories repeat a small set of (protocol, port) combinations, so each
+    is formatted once and the resulting strings are shared by all edges.
+    """
+    if protocol == "-1" and from_port == -1 and to_port == -1:
+        return _ALL_TRAFFIC_LABEL, _ALL_TRAFFIC_PORTS
+    return f"{protocol}:{format_ports(from_port, to_port)}", f"{from_port}-{to_port}"
+
+
+def _queue_edge(
+    edge_batch: Dict[Tuple[str, str], Dict], source: str, target: str, attrs: Dict
+) -> None:
+    """Queue an edge, merging rules that connect the same pair of nodes.
+
+    A graph holds one edge per ordered pair, so the distinct labels and ports
+    of every rule between the same source and target are joined onto a single
+    edge, which is cross-VPC if any of its rules is.
+    """
+    existing = edge_batch.get((source, target))
+    if existing is None:
+        edge_batch[(source, target)] = attrs
+        return
+    if attrs["label"] not in existing["label"].split(", "):
+        existing["label"] = f"{existing['label']}, {attrs['label']}"
+    if attrs["ports"] not in existing["ports"].split(", "):
+        existing["ports"] = f"{existing['ports']}, {attrs['ports']}"
+    existing["is_cross_vpc"] = existing["is_cross_vpc"] or attrs["is_cross_vpc"]
+
+
+# The frozen graph is held as separate arrays that renderers index directly
+class BaseVisualizer(ABC):  # pylint: disable=too-many-instance-attributes
     """Base class for visualization implementations."""
 
+    # Layouts shared across instances, keyed by graph topology and layout options
+    _pos_cache: Dict[str, Dict] = {}
+    _pos_cache_size = 32
+
     def __init__(self):
         """Initialize base visualizer."""
         self.graph = nx.DiGraph()
         self.highlight_sg = None
+        # Ungrouped graph, kept when build_graph aggregates a large inventory
+        self._full_graph: Optional[nx.DiGraph] = None
+        # Positions of the last layout, used to warm-start the next one
+        self._last_layout: Optional[Dict] = None
+        self.aggregate_threshold = config.get(
+            "visualization", "aggregate_threshold", default=500
+        )
+        self.aggregate_edge_threshold = config.get(
+            "visualization", "aggregate_edge_threshold", default=10000
+        )
+        self.layout_algorithm = config.get("visualization", "layout", default="spring")
+        self._freeze()
 
     def clear(self) -> None:
         """Clear the current graph data."""
         self.graph.clear()
         self.highlight_sg = None
+        self._full_graph = None
+        self._freeze()
 
     def build_graph(
         self, security_groups: List[Dict], highlight_sg: Optional[str] = None
@@ -27,76 +141,501 @@ class BaseVisualizer(ABC):
         self.clear()
         self.highlight_sg = highlight_sg
 
-        # Add nodes for each security group
+        # Collect nodes and edges, then insert them in bulk
+        node_batch: List[Tuple[str, Dict]] = []
+        edge_batch: Dict[Tuple[str, str], Dict] = {}
+        # Defined groups never need a placeholder node for references to them
+        added_nodes: Set[str] = {sg["GroupId"] for sg in security_groups}
+
         for sg in security_groups:
-            group_id = sg["GroupId"]
+            # Interned so every edge and node dict shares one key object
+            group_id = sys.intern(sg["GroupId"])
             group_name = sg.get("GroupName", "Unknown")
             description = sg.get("Description", "")
             vpc_id = sg.get("VpcId", "Unknown VPC")
 
             # Add the security group node
-            self.graph.add_node(
-                group_id,
-                name=group_name,
-                description=description,
-                vpc_id=vpc_id,
-                type="security_group",
-                is_highlighted=group_id == self.highlight_sg,
+            node_batch.append(
+                (
+                    group_id,
+                    {
+                        "name": group_name,
+                        "description": description,
+                        "vpc_id": vpc_id,
+                        "type": "security_group",
+                        "is_highlighted": group_id == self.highlight_sg,
+                    },
+                )
             )
 
             # Process inbound rules
-            for permission in sg.get("IpPermissions", []):
-                self._process_permission(permission, group_id, vpc_id)
+            for permission in sg.get("IpPermissions") or _EMPTY:
+                self._process_permission(
+                    permission,
+                    group_id,
+                    vpc_id,
+                    node_batch=node_batch,
+                    edge_batch=edge_batch,
+                    added_nodes=added_nodes,
+                )
+
+        self.graph.add_nodes_from(node_batch)
+        self.graph.add_edges_from((u, v, d) for (u, v), d in edge_batch.items())
+
+        aggregate = self.aggregate_threshold and (
+            self.graph.number_of_nodes() > self.aggregate_threshold
+            or self.graph.number_of_edges() > self.aggregate_edge_threshold
+        )
+        # Aggregation freezes the graph it produces
+        if not (aggregate and self.aggregate_graph()):
+            self._freeze()
 
     def _process_permission(
-        self, permission: Dict, target_group_id: str, vpc_id: str
+        self,
+        permission: Dict,
+        target_group_id: str,
+        vpc_id: str,
+        *,
+        node_batch: List[Tuple[str, Dict]],
+        edge_batch: Dict[Tuple[str, str], Dict],
+        added_nodes: Set[str],
     ) -> None:
-        """Process a single permission rule."""
+        """Collect the nodes and edges for a single permission rule.
+
+        Args:
+            permission: Ingress permission from the security group
+            target_group_id: ID of the security group the rule belongs to
+            vpc_id: VPC of the target security group
+            node_batch: List collecting ``(node, attrs)`` tuples
+            edge_batch: Edge attributes collected by ``(source, target)``
+            added_nodes: IDs of nodes already queued in this build
+        """
+        group_pairs = permission.get("UserIdGroupPairs")
+        ip_ranges = permission.get("IpRanges")
+        if not group_pairs and not ip_ranges:
+            return
+
         from_port = permission.get("FromPort", -1)
         to_port = permission.get("ToPort", -1)
         protocol = permission.get("IpProtocol", "-1")
 
+        # Labels only depend on the rule, so build them once for all sources
+        edge_label, ports = _rule_labels(protocol, from_port, to_port)
+
         # Handle security group references
-        for group_pair in permission.get("UserIdGroupPairs", []):
+        for group_pair in group_pairs or _EMPTY:
             source_id = group_pair.get("GroupId")
             source_vpc = group_pair.get("VpcId", "Unknown VPC")
 
             if source_id:
-                if source_id not in self.graph:
-                    self.graph.add_node(
-                        source_id,
-                        name=f"Security Group {source_id}",
-                        description="Referenced Security Group",
-                        vpc_id=source_vpc,
-                        type="security_group",
-                        is_highlighted=source_id == self.highlight_sg,
+                source_id = sys.intern(source_id)
+                if source_id not in added_nodes:
+                    added_nodes.add(source_id)
+                    node_batch.append(
+                        (
+                            source_id,
+                            {
+                                "name": f"Security Group {source_id}",
+                                "description": "Referenced Security Group",
+                                "vpc_id": source_vpc,
+                                "type": "security_group",
+                                "is_highlighted": source_id == self.highlight_sg,
+                            },
+                        )
                     )
 
-                edge_label = f"{protocol}:{format_ports(from_port, to_port)}"
                 is_cross_vpc = source_vpc not in (vpc_id, "Unknown VPC")
-                self.graph.add_edge(
+                _queue_edge(
+                    edge_batch,
                     source_id,
                     target_group_id,
-                    label=edge_label,
-                    ports=f"{from_port}-{to_port}",
-                    is_cross_vpc=is_cross_vpc,
+                    {"label": edge_label, "ports": ports, "is_cross_vpc": is_cross_vpc},
                 )
 
         # Handle CIDR ranges
-        for ip_range in permission.get("IpRanges", []):
+        for ip_range in ip_ranges or _EMPTY:
             cidr = ip_range.get("CidrIp")
             if cidr:
-                friendly_name = get_friendly_cidr_name(cidr)
-                cidr_node = f"CIDR: {friendly_name}"
-                self.graph.add_node(cidr_node, name=friendly_name, type="cidr")
-                edge_label = f"{protocol}:{format_ports(from_port, to_port)}"
-                self.graph.add_edge(
+                friendly_name, cidr_node = _cidr_node_label(cidr)
+                if cidr_node not in added_nodes:
+                    added_nodes.add(cidr_node)
+                    node_batch.append(
+                        (cidr_node, {"name": friendly_name, "type": "cidr"})
+                    )
+                _queue_edge(
+                    edge_batch,
                     cidr_node,
                     target_group_id,
-                    label=edge_label,
-                    ports=f"{from_port}-{to_port}",
-                    is_cross_vpc=False,
+                    {"label": edge_label, "ports": ports, "is_cross_vpc": False},
+                )
+
+    def _freeze(self) -> None:
+        """Snapshot the graph as parallel arrays for the render path.
+
+        Nodes are numbered in graph order, the same order ``layout_arrays``
+        uses for coordinate rows. Edges become index arrays plus a label list,
+        so renderers can gather endpoints by fancy indexing instead of walking
+        the NetworkX edge dicts. Security group and CIDR nodes, and the
+        security groups of every VPC, are partitioned once here as well.
+        """
+        self._node_ids: List[str] = list(self.graph)
+        self._sg_nodes: List[str] = []
+        self._cidr_nodes: List[str] = []
+        self._vpc_groups: Dict[str, List[str]] = {}
+        for node, data in self.graph.nodes(data=True):
+            node_type = data.get("type")
+            if node_type == "security_group":
+                self._sg_nodes.append(node)
+                vpc_id = data.get("vpc_id", "Unknown VPC")
+                self._vpc_groups.setdefault(vpc_id, []).append(node)
+            elif node_type == "cidr":
+                self._cidr_nodes.append(node)
+        self._node_index: Dict[str, int] = {n: i for i, n in enumerate(self._node_ids)}
+        edges = list(self.graph.edges(data=True))
+        count = len(edges)
+        index = self._node_index
+        self._edge_src = np.fromiter(
+            (index[u] for u, _, _ in edges), dtype=np.intp, count=count
+        )
+        self._edge_dst = np.fromiter(
+            (index[v] for _, v, _ in edges), dtype=np.intp, count=count
+        )
+        self._edge_label: List[str] = [d.get("label", "") for _, _, d in edges]
+        self._edge_is_cross_vpc = np.fromiter(
+            (d.get("is_cross_vpc", False) for _, _, d in edges), dtype=bool, count=count
+        )
+
+    @staticmethod
+    def _equivalent_groups(
+        graph: nx.DiGraph,
+    ) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """Find the security groups that ``aggregate_graph`` merges.
+
+        Args:
+            graph: Graph to aggregate
+
+        Returns:
+            Tuple containing:
+            - Dict mapping every merged group to the first group of its class
+            - Dict mapping each of those first groups to the number of groups
+              it stands for
+        """
+        signatures: Dict[Tuple, List[str]] = {}
+        for node, data in graph.nodes(data=True):
+            if data.get("type") != "security_group" or data.get("is_highlighted"):
+                continue
+            signature = (
+                data.get("vpc_id"),
+                frozenset(
+                    (u, d.get("label")) for u, _, d in graph.in_edges(node, True)
+                ),
+                frozenset(
+                    (v, d.get("label")) for _, v, d in graph.out_edges(node, True)
+                ),
+            )
+            signatures.setdefault(signature, []).append(node)
+
+        representative: Dict[str, str] = {}
+        counts: Dict[str, int] = {}
+        for members in signatures.values():
+            if len(members) > 1:
+                counts[members[0]] = sum(
+                    graph.nodes[member].get("count", 1) for member in members
+                )
+                for member in members:
+                    representative[member] = members[0]
+        return representative, counts
+
+    def aggregate_graph(self) -> bool:
+        """Collapse equivalent security groups into single nodes.
+
+        Security groups in the same VPC with identical inbound sources and
+        outbound references (including rule labels) are drawn as one node with
+        a ``count`` attribute. Merged edges carry the number of edges they
+        replace in ``count``. The highlighted group is never merged. The
+        original graph is kept in ``_full_graph`` and the aggregated graph is
+        frozen.
+
+        Returns:
+            bool: True if any security groups were merged
+        """
+        graph = self.graph
+        representative, counts = self._equivalent_groups(graph)
+        if not counts:
+            return False
+
+        # Names come from the original graph, so aggregating an aggregated
+        # graph again does not stack "(+n similar)" suffixes
+        original = self._full_graph if self._full_graph is not None else graph
+
+        aggregated = nx.DiGraph()
+        for node, data in graph.nodes(data=True):
+            if representative.get(node, node) != node:
+                continue
+            if node in counts:
+                data = {
+                    **data,
+                    "name": (
+                        f"{original.nodes[node].get('name', node)} "
+                        f"(+{counts[node] - 1} similar)"
+                    ),
+                    "count": counts[node],
+                }
+            aggregated.add_node(node, **data)
+        for u, v, data in graph.edges(data=True):
+            u = representative.get(u, u)
+            v = representative.get(v, v)
+            if aggregated.has_edge(u, v):
+                aggregated[u][v]["count"] += data.get("count", 1)
+            else:
+                aggregated.add_edge(u, v, **{"count": 1, **data})
+
+        logger.info(
+            "Merged %d equivalent security groups into %d nodes, graph reduced "
+            "from %d to %d nodes (set visualization.aggregate_threshold to 0 "
+            "to draw every group)",
+            sum(counts.values()),
+            len(counts),
+            graph.number_of_nodes(),
+            aggregated.number_of_nodes(),
+        )
+        if self._full_graph is None:
+            self._full_graph = graph
+        self.graph = aggregated
+        self._freeze()
+        return True
+
+    def _layout_key(self, layout_kwargs: Dict) -> str:
+        """Digest the graph topology and layout options into a cache key."""
+        signature = repr(
+            (
+                self.layout_algorithm,
+                sorted(self.graph.nodes()),
+                sorted(self.graph.edges()),
+                sorted(layout_kwargs.items()),
+            )
+        )
+        return hashlib.blake2b(signature.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _load_layout(self, key: str) -> Optional[Dict]:
+        """Load a persisted layout for the given key, if present and valid."""
+        cache_path = LAYOUT_CACHE_DIR / f"{key}.npz"
+        if not config.get("cache", "layouts", default=True) or not cache_path.exists():
+            return None
+
+        try:
+            with np.load(cache_path) as cached:
+                nodes = [str(node) for node in cached["nodes"]]
+                coords = cached["pos"]
+            if set(nodes) != set(self.graph.nodes()):
+                return None
+            # Mark the entry as recently used for _prune_layouts
+            cache_path.touch()
+            return dict(zip(nodes, coords))
+        except Exception as e:
+            logger.error("Error reading layout cache: %s", str(e))
+            return None
+
+    def _save_layout(self, key: str, pos: Dict) -> None:
+        """Persist a computed layout so later runs can skip the computation."""
+        if not config.get("cache", "layouts", default=True):
+            return
+
+        temp_path = None
+        try:
+            LAYOUT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Parallel renders share the directory, so write to a temporary
+            # file and move it into place, never exposing a partial layout
+            with tempfile.NamedTemporaryFile(
+                dir=LAYOUT_CACHE_DIR, suffix=".tmp", delete=False
+            ) as f:
+                temp_path = f.name
+                np.savez_compressed(
+                    f,
+                    nodes=np.array(list(pos), dtype=str),
+                    pos=np.array(list(pos.values()), dtype=np.float64).reshape(-1, 2),
                 )
+            os.replace(temp_path, LAYOUT_CACHE_DIR / f"{key}.npz")
+            temp_path = None
+            self._prune_layouts()
+        except Exception as e:
+            if temp_path is not None:
+                Path(temp_path).unlink(missing_ok=True)
+            logger.error("Error saving layout cache: %s", str(e))
+
+    @staticmethod
+    def _prune_layouts() -> None:
+        """Drop the least recently used layouts beyond the configured limit.
+
+        Parallel renders save and prune the same directory, so layouts that
+        another process removed in the meantime are skipped.
+        """
+        layouts = []
+        for path in LAYOUT_CACHE_DIR.glob("*.npz"):
+            try:
+                layouts.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        layouts.sort()
+        for _, stale in layouts[: max(len(layouts) - LAYOUT_CACHE_MAX_FILES, 0)]:
+            stale.unlink(missing_ok=True)
+
+    def _select_layout(self, seeded: bool) -> Optional[Callable]:
+        """Return the layout function for the graph, None for nx.spring_layout.
+
+        Args:
+            seeded: Whether initial positions are passed to the layout
+        """
+        layout = _LAYOUTS.get(self.layout_algorithm)
+        if layout is not None:
+            return layout
+        if len(self.graph) > _MULTILEVEL_LAYOUT_THRESHOLD and not seeded:
+            return multilevel_layout
+        if len(self.graph) > _LBFGS_LAYOUT_THRESHOLD:
+            return lbfgs_layout
+        return None
+
+    def _run_layout(self, **layout_kwargs) -> Dict:
+        """Run the configured layout, seeding large graphs with a spectral layout.
+
+        The spectral layout uses SciPy's sparse eigensolver once the graph
+        reaches ``_SPECTRAL_INIT_THRESHOLD`` nodes and gives the force
+        iterations a good starting point. With the ``barnes_hut`` layout the
+        repulsion is approximated in O(n log n), and the ``igraph`` layout runs
+        Fruchterman-Reingold in compiled code. Otherwise graphs above
+        ``_MULTILEVEL_LAYOUT_THRESHOLD`` nodes without initial positions use
+        ``multilevel_layout`` and graphs above ``_LBFGS_LAYOUT_THRESHOLD``
+        nodes use ``lbfgs_layout``, both of which converge faster than
+        ``nx.spring_layout`` at that size. Layouts whose optional dependency
+        is missing fall back to ``nx.spring_layout``.
+        """
+        layout = self._select_layout(seeded="pos" in layout_kwargs)
+        # The multilevel layout seeds itself from its coarsest level
+        if (
+            len(self.graph) >= _SPECTRAL_INIT_THRESHOLD
+            and "pos" not in layout_kwargs
+            and layout is not multilevel_layout
+        ):
+            try:
+                spectral = nx.spectral_layout(self.graph)
+            except ImportError:
+                logger.warning("SciPy not available, using random initial layout")
+            else:
+                # Nodes of a small component share one spectral position, and
+                # coincident nodes exert no force to push each other apart
+                seed = layout_kwargs.get("seed")
+                rng = np.random.default_rng(0 if seed is None else seed)
+                jitter = rng.normal(0, _SPECTRAL_JITTER, (len(spectral), 2))
+                layout_kwargs["pos"] = {
+                    node: xy + offset
+                    for (node, xy), offset in zip(spectral.items(), jitter)
+                }
+        if layout is not None:
+            try:
+                return layout(self.graph, **layout_kwargs)
+            except ImportError as e:
+                logger.warning("Falling back to nx.spring_layout: %s", str(e))
+        return nx.spring_layout(self.graph, **layout_kwargs)
+
+    def _warm_start(self, seed: Optional[int] = None) -> Optional[Dict]:
+        """Initial positions from the previous layout, if the graph is similar.
+
+        Args:
+            seed: Seed for placing nodes that have no placed neighbors
+
+        Returns:
+            Optional[Dict]: Positions for every node, or None when fewer than
+            ``_WARM_START_OVERLAP`` of the nodes are shared with the previous
+            layout. New nodes start at the mean of their placed neighbors.
+        """
+        previous = self._last_layout
+        if not previous:
+            return None
+        shared = previous.keys() & self.graph.nodes
+        if len(shared) < _WARM_START_OVERLAP * len(previous.keys() | self.graph.nodes):
+            return None
+
+        pos = {node: previous[node] for node in shared}
+        rng = np.random.default_rng(0 if seed is None else seed)
+        for node in self.graph:
+            if node in pos:
+                continue
+            placed = [pos[n] for n in nx.all_neighbors(self.graph, node) if n in pos]
+            pos[node] = (
+                np.mean(placed, axis=0) if placed else rng.uniform(-1, 1, 2)
+            ) + rng.normal(0, 0.01, 2)
+        logger.debug("Warm-starting layout from %d previous positions", len(shared))
+        return pos
+
+    def compute_layout(self, **layout_kwargs) -> Dict:
+        """Compute node positions, reusing a cached layout for the same topology.
+
+        Re-rendering a graph with a different highlight does not change its
+        structure, so the expensive spring layout is only run once per topology.
+        Layouts are kept in memory and persisted under the cache directory.
+        When the topology changed only slightly since the previous layout, the
+        new one starts from the previous positions and runs fewer iterations,
+        unless the configured layout computes its own initial positions. Such
+        a layout depends on what was rendered before, so it is only kept in
+        memory and a later run with a cold cache still gets the cold layout.
+
+        Args:
+            **layout_kwargs: Keyword arguments passed to the layout function
+
+        Returns:
+            Dict: Mapping of node IDs to (x, y) positions
+        """
+        key = self._layout_key(layout_kwargs)
+        pos = self._pos_cache.get(key)
+        if pos is None:
+            pos = self._load_layout(key)
+            if pos is None:
+                warm = None
+                # The key is already computed, so the options can be adjusted.
+                # The multilevel layout ignores initial positions, and seeding
+                # the default layout of a large graph would trade it for the
+                # quadratic L-BFGS layout, so those keep their cold layout
+                if (
+                    "pos" not in layout_kwargs
+                    and self._select_layout(seeded=False) is not multilevel_layout
+                ):
+                    warm = self._warm_start(layout_kwargs.get("seed"))
+                    if warm is not None:
+                        layout_kwargs["pos"] = warm
+                        layout_kwargs["iterations"] = min(
+                            layout_kwargs.get("iterations", 50), _WARM_START_ITERATIONS
+                        )
+                pos = self._run_layout(**layout_kwargs)
+                # A warm-started layout depends on the previous render
+                if warm is None:
+                    self._save_layout(key, pos)
+            if len(self._pos_cache) >= self._pos_cache_size:
+                self._pos_cache.pop(next(iter(self._pos_cache)))
+            self._pos_cache[key] = pos
+        else:
+            logger.debug("Reusing cached layout for %d nodes", len(pos))
+        self._last_layout = pos
+        # Callers may reposition nodes, so never hand out the cached dict itself
+        return dict(pos)
+
+    def layout_arrays(self, pos: Dict) -> Tuple[Dict[str, int], np.ndarray]:
+        """Convert layout positions into a node index map and coordinate array.
+
+        Args:
+            pos: Mapping of node IDs to (x, y) positions
+
+        Returns:
+            Tuple containing:
+            - Dict mapping node IDs to row indices
+            - (n, 2) float32 array of node coordinates in graph node order. Render
+              precision is plenty for positions scaled to [-1, 1], and it halves
+              the typed arrays written to Plotly output.
+        """
+        nodes = self._node_ids
+        coords = np.fromiter(
+            (c for n in nodes for c in pos[n]), dtype=np.float32, count=2 * len(nodes)
+        ).reshape(-1, 2)
+        return self._node_index, coords
 
     def group_nodes_by_vpc(self) -> Tuple[Dict[str, List[str]], List[str]]:
         """Group nodes by VPC and separate CIDR nodes.
@@ -106,22 +645,12 @@ class BaseVisualizer(ABC):
             - Dict mapping VPC IDs to lists of node IDs
             - List of CIDR node IDs
         """
-        vpc_groups = {}
-        cidr_nodes = []
-
-        for node, data in self.graph.nodes(data=True):
-            if data.get("type") == "security_group":
-                vpc_id = data.get("vpc_id", "Unknown VPC")
-                if vpc_id not in vpc_groups:
-                    vpc_groups[vpc_id] = []
-                vpc_groups[vpc_id].append(node)
-            elif data.get("type") == "cidr":
-                cidr_nodes.append(node)
-
-        return vpc_groups, cidr_nodes
+        # Partitioned when the graph was frozen, copied so callers can modify
+        vpc_groups = {vpc_id: list(nodes) for vpc_id, nodes in self._vpc_groups.items()}
+        return vpc_groups, list(self._cidr_nodes)
 
     @abstractmethod
     def generate_visualization(
         self, output_path: str, title: Optional[str] = None
-    ) -> None:
-        """Generate and save the visualization."""
+    ) -> Optional[str]:
+        """Generate and save the visualization, returning the written path."""
@@ -0,0 +1,574 @@
+"""Force-directed layouts for large security group graphs."""
+
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+# Pairwise repulsion is evaluated in row blocks of about this many pairs
+_BLOCK_PAIRS = 1 << 20
+# Rows of the pairwise repulsion handled together by one numba worker
+_KERNEL_BLOCK = 64
+# Barnes-Hut refines its grid until no finest cell holds more nodes than this
+_MAX_CELL_NODES = 32
+_MAX_DEPTH = 10
+# Multilevel layouts stop coarsening below this many nodes, or once a level
+# keeps more than this fraction of the nodes of the level below
+_MIN_COARSE_NODES = 100
+_COARSEN_RATIO = 0.8
+# Iterations spent refining each finer level of a multilevel layout
+_REFINE_ITERATIONS = 10
+_REFINE_TEMPERATURE = 0.02
+
+
+def _edge_arrays(graph: nx.Graph) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the undirected, de-duplicated edge list as index arrays."""
+    # SciPy is slow to import, so only load it when a layout runs
+    from scipy import sparse  # pylint: disable=import-outside-toplevel
+
+    adjacency = nx.to_scipy_sparse_array(graph, weight=None, format="csr")
+    adjacency = sparse.triu(adjacency + adjacency.T, k=1).tocoo()
+    return adjacency.row.astype(np.intp), adjacency.col.astype(np.intp)
+
+
+@lru_cache(maxsize=None)
+def _fr_repulsion_jit() -> Optional[Callable]:
+    """Compile the pairwise repulsion kernel with numba, or None without numba.
+
+    numba is slow to import, so it is only loaded the first time a layout
+    needs the kernel rather than whenever the visualizers are imported. The
+    kernel is defined here so its parallel loop can use ``numba.prange``.
+    """
+    try:
+        import numba  # pylint: disable=import-outside-toplevel
+        from numba import prange  # pylint: disable=import-outside-toplevel
+    except ImportError:  # numba is optional, the NumPy kernels are used without it
+        return None
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _fr_repulsion_kernel(
+        px: np.ndarray, py: np.ndarray, k: float, grad_x: np.ndarray, grad_y: np.ndarray
+    ) -> float:
+        """Pairwise ``-k**2 * ln(d)`` repulsion, written as loops for numba.
+
+        Rows are processed in cache-sized blocks of ``_KERNEL_BLOCK`` nodes, one
+        block per parallel worker. The gradient is written into ``grad_x`` and
+        ``grad_y``.
+
+        Returns:
+            float: Repulsion energy
+        """
+        n = px.shape[0]
+        k2 = k * k
+        min_dist2 = (0.01 * k) ** 2
+        blocks = (n + _KERNEL_BLOCK - 1) // _KERNEL_BLOCK
+        block_energy = np.zeros(blocks)
+        # numba.prange returns a range, which pylint cannot infer
+        for block in prange(blocks):  # pylint: disable=not-an-iterable
+            log_sum = 0.0
+            for i in range(block * _KERNEL_BLOCK, min((block + 1) * _KERNEL_BLOCK, n)):
+                gx = 0.0
+                gy = 0.0
+                for j in range(n):
+                    if j != i:
+                        dx = px[i] - px[j]
+                        dy = py[i] - py[j]
+                        dist2 = max(dx * dx + dy * dy, min_dist2)
+                        gx += dx / dist2
+                        gy += dy / dist2
+                        log_sum += np.log(dist2)
+                grad_x[i] = -k2 * gx
+                grad_y[i] = -k2 * gy
+            block_energy[block] = log_sum
+        return -0.25 * k2 * block_energy.sum()
+
+    return _fr_repulsion_kernel
+
+
+def _fr_repulsion_numpy(pos: np.ndarray, k: float, grad: np.ndarray) -> float:
+    """Pairwise ``-k**2 * ln(d)`` repulsion in vectorized blocks of rows.
+
+    The gradient is added to ``grad``.
+
+    Returns:
+        float: Repulsion energy
+    """
+    n = len(pos)
+    min_dist2 = (0.01 * k) ** 2
+    block = max(1, _BLOCK_PAIRS // n)
+    energy = 0.0
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        diff = pos[start:stop, None, :] - pos[None, :, :]
+        dist2 = np.einsum("ijk,ijk->ij", diff, diff)
+        np.maximum(dist2, min_dist2, out=dist2)
+        # A node does not repel itself
+        dist2[np.arange(stop - start), np.arange(start, stop)] = 1.0
+        energy -= 0.25 * k**2 * float(np.log(dist2).sum())
+        grad[start:stop] -= k**2 * np.einsum("ijk,ij->ik", diff, 1.0 / dist2)
+    return energy
+
+
+def _fr_energy(
+    flat: np.ndarray, rows: np.ndarray, cols: np.ndarray, k: float
+) -> Tuple[float, np.ndarray]:
+    """Fruchterman-Reingold energy and its gradient.
+
+    Edges attract with energy ``d**3 / (3k)`` and every pair of nodes repels
+    with ``-k**2 * ln(d)``, so the gradients are the classic FR forces. A weak
+    quadratic term keeps disconnected components from drifting apart.
+
+    Args:
+        flat: Flattened (n, 2) node positions
+        rows: Source index of each edge
+        cols: Target index of each edge
+        k: Optimal distance between nodes
+
+    Returns:
+        Tuple of the energy and its flattened gradient
+    """
+    pos = flat.reshape(-1, 2)
+    n = len(pos)
+
+    # Attraction along edges
+    delta = pos[rows] - pos[cols]
+    dist = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+    energy = float(dist @ dist**2) / (3 * k)
+    force = delta * (dist / k)[:, None]
+    grad = np.empty_like(pos)
+    for axis in (0, 1):
+        grad[:, axis] = np.bincount(rows, force[:, axis], n) - np.bincount(
+            cols, force[:, axis], n
+        )
+
+    # Repulsion between all pairs, compiled when numba is available
+    kernel = _fr_repulsion_jit()
+    if kernel is not None:
+        repulsion = np.empty((2, n))
+        energy += kernel(
+            np.ascontiguousarray(pos[:, 0]),
+            np.ascontiguousarray(pos[:, 1]),
+            k,
+            repulsion[0],
+            repulsion[1],
+        )
+        grad += repulsion.T
+    else:
+        energy += _fr_repulsion_numpy(pos, k, grad)
+
+    energy += 0.5 * float(np.einsum("ij,ij->", pos, pos))
+    grad += pos
+    return energy, grad.ravel()
+
+
+def lbfgs_layout(
+    graph: nx.Graph,
+    k: Optional[float] = None,
+    pos: Optional[Dict] = None,
+    iterations: int = 50,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Position nodes by minimizing the Fruchterman-Reingold energy with L-BFGS.
+
+    Large graphs converge in far fewer gradient evaluations than the
+    temperature-driven iterations of ``nx.spring_layout``, and each evaluation
+    is vectorized NumPy.
+
+    Args:
+        graph: Graph to lay out
+        k: Optimal distance between nodes, defaults to ``1 / sqrt(n)``
+        pos: Initial positions, random when not given
+        iterations: Maximum number of L-BFGS iterations
+        seed: Seed for the random initial positions
+
+    Returns:
+        Dict: Mapping of node IDs to (x, y) positions scaled to [-1, 1]
+    """
+    # SciPy is slow to import, so only load it when a layout runs
+    from scipy.optimize import minimize  # pylint: disable=import-outside-toplevel
+
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    k = k or 1 / np.sqrt(n)
+    # Unit initial positions are stretched to the scale the energy settles at
+    init_scale = k * np.sqrt(n)
+    if pos is not None:
+        start = np.array([pos[node] for node in nodes], dtype=np.float64)
+        start *= init_scale / max(np.abs(start).max(), 1e-12)
+    else:
+        start = np.random.default_rng(seed).uniform(-init_scale, init_scale, (n, 2))
+
+    rows, cols = _edge_arrays(graph)
+    result = minimize(
+        _fr_energy,
+        start.ravel(),
+        args=(rows, cols, k),
+        method="L-BFGS-B",
+        jac=True,
+        options={"maxiter": iterations},
+    )
+    coords = nx.rescale_layout(result.x.reshape(-1, 2), scale=1)
+    return dict(zip(nodes, coords))
+
+
+def _cell_index(pos: np.ndarray, lo: np.ndarray, span: float, size: int) -> np.ndarray:
+    """Return the (n, 2) cell of every node on a ``size`` x ``size`` grid."""
+    cell = ((pos - lo) * (size / span)).astype(np.intp)
+    return np.clip(cell, 0, size - 1, out=cell)
+
+
+def _finest_grid(
+    pos: np.ndarray, lo: np.ndarray, span: float
+) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """Pick the finest Barnes-Hut grid and bin the nodes into it.
+
+    The grid aims for a handful of nodes per cell and is refined while a
+    dense cluster leaves more than ``_MAX_CELL_NODES`` nodes in one cell.
+
+    Returns:
+        Tuple containing:
+        - Depth of the grid, which has ``2**depth`` cells per side
+        - (n, 2) cell of every node
+        - (n,) flattened cell index of every node
+        - Number of nodes in every flattened cell
+    """
+    depth = max(2, int(np.ceil(np.log(max(len(pos) / 4, 1)) / np.log(4))))
+    while True:
+        size = 1 << depth
+        cell = _cell_index(pos, lo, span, size)
+        flat = cell[:, 0] * size + cell[:, 1]
+        counts = np.bincount(flat, minlength=size * size)
+        if counts.max() <= _MAX_CELL_NODES or depth >= _MAX_DEPTH:
+            return depth, cell, flat, counts
+        depth += 1
+
+
+def _barnes_hut_repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    """Approximate the all-pairs ``k**2 / d`` repulsion in O(n log n).
+
+    Space is split into a quadtree of regular grids. On every level a node
+    interacts with the centers of mass of the cells that are well separated
+    from its own cell but were too close on the parent level. Nodes in the
+    same or adjacent cells of the finest level repel each other directly.
+
+    Args:
+        pos: (n, 2) node positions
+        k: Optimal distance between nodes
+
+    Returns:
+        np.ndarray: (n, 2) repulsive displacement for every node
+    """
+    n = len(pos)
+    k2 = k * k
+    min_dist2 = (0.01 * k) ** 2
+    lo = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lo).max()), 1e-9)
+    force = np.zeros_like(pos)
+    depth, cell, flat, counts = _finest_grid(pos, lo, span)
+
+    # Far field: monopole of each cell in the interaction list
+    far_offsets = np.array([(a, b) for a in range(-2, 4) for b in range(-2, 4)])
+    for level in range(2, depth + 1):
+        size = 1 << level
+        level_cell = _cell_index(pos, lo, span, size)
+        level_flat = level_cell[:, 0] * size + level_cell[:, 1]
+        mass = np.bincount(level_flat, minlength=size * size).astype(np.float64)
+        com = np.stack(
+            [np.bincount(level_flat, pos[:, axis], size * size) for axis in (0, 1)],
+            axis=1,
+        )
+        com /= np.maximum(mass, 1.0)[:, None]
+        first_child = level_cell // 2 * 2
+        for offset in far_offsets:
+            target = first_child + offset
+            valid = ((target >= 0) & (target < size)).all(axis=1)
+            valid &= (np.abs(target - level_cell) > 1).any(axis=1)
+            idx = np.flatnonzero(valid)
+            target_flat = target[idx, 0] * size + target[idx, 1]
+            delta = pos[idx] - com[target_flat]
+            dist2 = np.maximum(np.einsum("ij,ij->i", delta, delta), min_dist2)
+            force[idx] += delta * (k2 * mass[target_flat] / dist2)[:, None]
+
+    # Near field: exact pairs between the same and adjacent finest cells
+    size = 1 << depth
+    order = np.argsort(flat, kind="stable")
+    starts = np.cumsum(counts) - counts
+    for offset in [(a, b) for a in (-1, 0, 1) for b in (-1, 0, 1)]:
+        target = cell + offset
+        idx = np.flatnonzero(((target >= 0) & (target < size)).all(axis=1))
+        # Nodes on the grid border have no neighbour cell in some directions
+        if idx.size == 0:
+            continue
+        target_flat = target[idx, 0] * size + target[idx, 1]
+        cnt = counts[target_flat]
+        # Split the nodes so each chunk expands to at most _BLOCK_PAIRS pairs
+        total = np.cumsum(cnt)
+        bounds = np.searchsorted(
+            total, np.arange(_BLOCK_PAIRS, total[-1], _BLOCK_PAIRS)
+        )
+        for chunk in np.split(np.arange(len(idx)), bounds):
+            chunk_cnt = cnt[chunk]
+            rows = np.repeat(idx[chunk], chunk_cnt)
+            within = np.arange(len(rows)) - np.repeat(
+                np.cumsum(chunk_cnt) - chunk_cnt, chunk_cnt
+            )
+            cols = order[np.repeat(starts[target_flat[chunk]], chunk_cnt) + within]
+            keep = rows != cols
+            rows, cols = rows[keep], cols[keep]
+            delta = pos[rows] - pos[cols]
+            dist2 = np.maximum(np.einsum("ij,ij->i", delta, delta), min_dist2)
+            pair_force = delta * (k2 / dist2)[:, None]
+            for axis in (0, 1):
+                force[:, axis] += np.bincount(rows, pair_force[:, axis], n)
+    return force
+
+
+def barnes_hut_layout(
+    graph: nx.Graph,
+    k: Optional[float] = None,
+    pos: Optional[Dict] = None,
+    iterations: int = 50,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Position nodes with Fruchterman-Reingold and Barnes-Hut repulsion.
+
+    Runs the same cooling schedule as ``nx.spring_layout``, but the
+    repulsive forces come from ``_barnes_hut_repulsion``, so an iteration
+    costs O(n log n) instead of O(n**2).
+
+    Args:
+        graph: Graph to lay out
+        k: Optimal distance between nodes, defaults to ``1 / sqrt(n)``
+        pos: Initial positions, random when not given
+        iterations: Number of iterations
+        seed: Seed for the random initial positions
+
+    Returns:
+        Dict: Mapping of node IDs to (x, y) positions scaled to [-1, 1]
+    """
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    k = k or 1 / np.sqrt(n)
+    # Start at the scale where repulsion and attraction balance, so a large k
+    # does not just push every node outward onto a ring
+    init_scale = k * np.sqrt(n)
+    if pos is not None:
+        coords = np.array([pos[node] for node in nodes], dtype=np.float64)
+        coords *= init_scale / max(np.abs(coords).max(), 1e-12)
+    else:
+        coords = np.random.default_rng(seed).uniform(-init_scale, init_scale, (n, 2))
+    rows, cols = _edge_arrays(graph)
+
+    temperature = 0.1 * float(np.ptp(coords, axis=0).max())
+    _barnes_hut_iterations(coords, rows, cols, k, iterations, temperature=temperature)
+    return dict(zip(nodes, nx.rescale_layout(coords, scale=1)))
+
+
+def _barnes_hut_iterations(
+    coords: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    k: float,
+    iterations: int,
+    *,
+    temperature: float,
+) -> None:
+    """Run cooled Fruchterman-Reingold steps on ``coords`` in place.
+
+    Args:
+        coords: (n, 2) node positions, updated in place
+        rows: Edge start indices
+        cols: Edge end indices
+        k: Optimal distance between nodes
+        iterations: Number of iterations
+        temperature: Maximum step length of the first iteration
+    """
+    n = len(coords)
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        displacement = _barnes_hut_repulsion(coords, k)
+        delta = coords[rows] - coords[cols]
+        dist = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        attraction = delta * (dist / k)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] += np.bincount(
+                cols, attraction[:, axis], n
+            ) - np.bincount(rows, attraction[:, axis], n)
+        # Same weak gravity as lbfgs_layout, holding components together
+        displacement -= coords
+        length = np.sqrt(np.einsum("ij,ij->i", displacement, displacement))
+        np.maximum(length, 0.01, out=length)
+        coords += displacement * (temperature / length)[:, None]
+        temperature -= cooling
+
+
+def _coarsen(
+    n: int, rows: np.ndarray, cols: np.ndarray, rng: np.random.Generator
+) -> Tuple[np.ndarray, int]:
+    """Collapse a random maximal matching of the edges into single nodes.
+
+    Args:
+        n: Number of nodes
+        rows: Edge start indices
+        cols: Edge end indices
+        rng: Random generator for the edge visiting order
+
+    Returns:
+        Tuple containing:
+        - (n,) index of the coarse node every node is merged into
+        - Number of coarse nodes
+    """
+    mate = [-1] * n
+    order = rng.permutation(len(rows))
+    for u, v in zip(rows[order].tolist(), cols[order].tolist()):
+        if mate[u] < 0 and mate[v] < 0:
+            mate[u] = v
+            mate[v] = u
+    mate = np.asarray(mate, dtype=np.intp)
+    node = np.arange(n)
+    representative = np.where(mate < 0, node, np.minimum(node, mate))
+    coarse, mapping = np.unique(representative, return_inverse=True)
+    return mapping, len(coarse)
+
+
+def multilevel_layout(
+    graph: nx.Graph,
+    k: Optional[float] = None,
+    pos: Optional[Dict] = None,  # pylint: disable=unused-argument  # common signature
+    iterations: int = 50,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Position nodes with a multilevel Barnes-Hut Fruchterman-Reingold layout.
+
+    The graph is coarsened by repeatedly merging a maximal matching of its
+    edges until it stops shrinking. The coarsest graph is laid out with the
+    full number of iterations, then each finer level starts from the
+    positions of the level above and only needs a short, cool refinement.
+    This untangles large graphs that a single level leaves folded.
+
+    Args:
+        graph: Graph to lay out
+        k: Optimal distance between nodes, defaults to ``1 / sqrt(n)``
+        pos: Ignored, the coarsest level provides the initial positions
+        iterations: Number of iterations on the coarsest level
+        seed: Seed for the matching order and the initial positions
+
+    Returns:
+        Dict: Mapping of node IDs to (x, y) positions scaled to [-1, 1]
+    """
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    k = k or 1 / np.sqrt(n)
+    rng = np.random.default_rng(seed)
+    rows, cols = _edge_arrays(graph)
+
+    # Coarsen while a level still removes a fifth of the nodes
+    levels = [(n, rows, cols)]
+    mappings = []
+    while levels[-1][0] > _MIN_COARSE_NODES:
+        size, level_rows, level_cols = levels[-1]
+        mapping, coarse_size = _coarsen(size, level_rows, level_cols, rng)
+        if coarse_size > _COARSEN_RATIO * size:
+            break
+        edges = np.unique(
+            np.sort(np.stack((mapping[level_rows], mapping[level_cols]), 1), 1),
+            axis=0,
+        )
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        levels.append((coarse_size, edges[:, 0], edges[:, 1]))
+        mappings.append(mapping)
+
+    size, level_rows, level_cols = levels[-1]
+    init_scale = k * np.sqrt(size)
+    coords = rng.uniform(-init_scale, init_scale, (size, 2))
+    temperature = 0.1 * float(np.ptp(coords, axis=0).max())
+    _barnes_hut_iterations(
+        coords, level_rows, level_cols, k, iterations, temperature=temperature
+    )
+
+    for (size, level_rows, level_cols), mapping in zip(
+        reversed(levels[:-1]), reversed(mappings)
+    ):
+        # Grow to the area of the finer level, merged nodes start on top of
+        # each other, so jitter them apart
+        coords = coords[mapping] * np.sqrt(size / len(coords))
+        coords += rng.uniform(-0.1 * k, 0.1 * k, (size, 2))
+        temperature = _REFINE_TEMPERATURE * float(np.ptp(coords, axis=0).max())
+        _barnes_hut_iterations(
+            coords,
+            level_rows,
+            level_cols,
+            k,
+            _REFINE_ITERATIONS,
+            temperature=temperature,
+        )
+
+    return dict(zip(nodes, nx.rescale_layout(coords, scale=1)))
+
+
+def igraph_layout(
+    graph: nx.Graph,
+    k: Optional[float] = None,  # pylint: disable=unused-argument  # common signature
+    pos: Optional[Dict] = None,
+    iterations: int = 50,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Position nodes with igraph's compiled Fruchterman-Reingold layout.
+
+    igraph picks its own optimal distance, so ``k`` is accepted only to keep
+    the signature of the other layouts. Raises ImportError when python-igraph
+    is not installed.
+
+    Args:
+        graph: Graph to lay out
+        k: Ignored
+        pos: Initial positions, random when not given
+        iterations: Number of iterations
+        seed: Seed for the random initial positions
+
+    Returns:
+        Dict: Mapping of node IDs to (x, y) positions scaled to [-1, 1]
+    """
+    # Optional dependency, a missing igraph falls back to nx.spring_layout
+    import igraph as ig  # pylint: disable=import-error,import-outside-toplevel
+
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    ig_graph = ig.Graph(
+        n=n, edges=[(index[u], index[v]) for u, v in graph.edges()], directed=False
+    )
+    ig_graph.simplify()
+
+    # igraph settles at a scale of about sqrt(n), start there
+    init_scale = np.sqrt(n)
+    if pos is not None:
+        start = np.array([pos[node] for node in nodes], dtype=np.float64)
+        start *= init_scale / max(np.abs(start).max(), 1e-12)
+    else:
+        start = np.random.default_rng(seed).uniform(-init_scale, init_scale, (n, 2))
+
+    layout = ig_graph.layout_fruchterman_reingold(niter=iterations, seed=start.tolist())
+    coords = nx.rescale_layout(np.asarray(layout.coords, dtype=np.float64), scale=1)
+    return dict(zip(nodes, coords))
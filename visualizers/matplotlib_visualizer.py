@@ -2,15 +2,18 @@
 
 from typing import Dict, List, Optional
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
 
 from config import config
-from utils import format_ports, get_friendly_cidr_name, logger
-from .base import BaseVisualizer
+from utils import logger
+from .base import COLORS, BaseVisualizer
 
-
-# Force matplotlib to use non-interactive backend
-plt.switch_backend("Agg")
+# Let Agg simplify and chunk long paths when the graph has many edges
+_RC_PARAMS = {
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize": 10000,
+}
 
 
 class MatplotlibVisualizer(BaseVisualizer):
@@ -23,12 +26,15 @@ class MatplotlibVisualizer(BaseVisualizer):
         self.node_size = self.settings.get("node_size", 2000)
         self.font_size = self.settings.get("font_size", 8)
         self.edge_width = self.settings.get("edge_width", 1)
+        self.max_edge_labels = self.settings.get("max_edge_labels", 0)
         self.pos = {}
+        self._edge_labels = {}
 
     def clear(self) -> None:
         """Clear the current graph data."""
         super().clear()
         self.pos = {}
+        self._edge_labels = {}
 
     def build_graph(
         self, security_groups: List[Dict], highlight_sg: Optional[str] = None
@@ -36,226 +42,202 @@ class MatplotlibVisualizer(BaseVisualizer):
         """Build NetworkX graph from security group data."""
         super().build_graph(security_groups, highlight_sg)
 
+    @staticmethod
+    def _rasterize(artists) -> None:
+        """Rasterize artists returned by NetworkX draw calls.
 
-    def _process_permission(
-        self, permission: Dict, target_group_id: str, vpc_id: str
-    ) -> None:
-        """Process a single permission rule."""
-        from_port = permission.get("FromPort", -1)
-        to_port = permission.get("ToPort", -1)
-        protocol = permission.get("IpProtocol", "-1")
-
-        # Handle security group references
-        for group_pair in permission.get("UserIdGroupPairs", []):
-            source_id = group_pair.get("GroupId")
-            source_vpc = group_pair.get("VpcId", "Unknown VPC")
-
-            if source_id:
-                if source_id not in self.graph:
-                    self.graph.add_node(
-                        source_id,
-                        name=f"Security Group {source_id}",
-                        description="Referenced Security Group",
-                        vpc_id=source_vpc,
-                        type="security_group",
-                        is_highlighted=source_id == self.highlight_sg,
-                    )
-
-                edge_label = f"{protocol}:{format_ports(from_port, to_port)}"
-                is_cross_vpc = source_vpc not in (vpc_id, "Unknown VPC")
-                self.graph.add_edge(
-                    source_id,
-                    target_group_id,
-                    label=edge_label,
-                    ports=f"{from_port}-{to_port}",
-                    is_cross_vpc=is_cross_vpc,
-                )
-
-        # Handle CIDR ranges
-        for ip_range in permission.get("IpRanges", []):
-            cidr = ip_range.get("CidrIp")
-            if cidr:
-                friendly_name = get_friendly_cidr_name(cidr)
-                cidr_node = f"CIDR: {friendly_name}"
-                self.graph.add_node(cidr_node, name=friendly_name, type="cidr")
-                edge_label = f"{protocol}:{format_ports(from_port, to_port)}"
-                self.graph.add_edge(
-                    cidr_node,
-                    target_group_id,
-                    label=edge_label,
-                    ports=f"{from_port}-{to_port}",
-                    is_cross_vpc=False,
-                )
+        Args:
+            artists: A single collection, or a list of arrow patches for directed
+                edges
+        """
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+        if artists is None:
+            return
+        if isinstance(artists, list):
+            # Arrow patches can't be rasterized one by one; rasterize their layer
+            if artists:
+                zorder = max(artist.get_zorder() for artist in artists)
+                plt.gca().set_rasterization_zorder(zorder + 0.01)
+            return
+        artists.set_rasterized(True)
 
     def _draw_vpc_groups(self) -> None:
         """Draw VPC boundaries and labels."""
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+        from matplotlib.collections import (  # pylint: disable=import-outside-toplevel
+            PatchCollection,
+        )
+
         # Create spring layout if not already set
         if not self.pos:
-            self.pos = nx.spring_layout(self.graph, k=3, iterations=50)
+            self.pos = self.compute_layout(k=3, iterations=50)
 
         vpc_groups, _ = self.group_nodes_by_vpc()
+        if not vpc_groups:
+            return
 
-        # Position nodes by VPC
+        # Lay the VPCs out side by side, one column per VPC. Nodes are
+        # concatenated VPC by VPC, so each VPC is one contiguous run of rows
         spacing = 2.0
-        current_x = 0
-
-        for vpc_id, nodes in vpc_groups.items():
-            if not nodes:
-                continue
-
-            center_x = current_x
-            center_y = 0
-
-            for node in nodes:
-                self.pos[node] = (
-                    self.pos[node][0] * 0.5 + center_x,
-                    self.pos[node][1] * 0.5 + center_y,
-                )
-            current_x += spacing
-
-            # Draw VPC boundary
-            vpc_pos = [self.pos[node] for node in nodes]
-            if vpc_pos:
-                min_x = min(x for x, y in vpc_pos) - 0.5
-                max_x = max(x for x, y in vpc_pos) + 0.5
-                min_y = min(y for x, y in vpc_pos) - 0.5
-                max_y = max(y for x, y in vpc_pos) + 0.5
-
-                rect = plt.Rectangle(
-                    (min_x, min_y),
-                    max_x - min_x,
-                    max_y - min_y,
-                    fill=True,
-                    facecolor="#f8f9fa",
-                    linestyle="solid",
-                    edgecolor="#6c757d",
-                    alpha=0.2,
-                    linewidth=3,
-                )
-                plt.gca().add_patch(rect)
-
-                # Add VPC label
-                plt.text(
-                    min_x + (max_x - min_x) / 2,
-                    max_y + 0.2,
-                    f"VPC: {vpc_id}",
-                    horizontalalignment="center",
-                    verticalalignment="bottom",
-                    fontsize=12,
-                    fontweight="bold",
-                    bbox={
-                        "facecolor": "white",
-                        "edgecolor": "none",
-                        "alpha": 0.7,
-                        "pad": 3,
-                    },
-                )
+        nodes = [node for group in vpc_groups.values() for node in group]
+        sizes = [len(group) for group in vpc_groups.values()]
+        starts = np.cumsum([0] + sizes[:-1])
+        vpc_pos = np.array([self.pos[node] for node in nodes]) * 0.5
+        vpc_pos[:, 0] += np.repeat(np.arange(len(sizes)) * spacing, sizes)
+        self.pos.update(zip(nodes, vpc_pos))
+
+        # VPC boundaries, with one segmented min/max reduction for all VPCs
+        mins = np.minimum.reduceat(vpc_pos, starts) - 0.5
+        maxs = np.maximum.reduceat(vpc_pos, starts) + 0.5
+
+        # All boundaries go into the axes as a single collection
+        plt.gca().add_collection(
+            PatchCollection(
+                [
+                    plt.Rectangle((min_x, min_y), max_x - min_x, max_y - min_y)
+                    for (min_x, min_y), (max_x, max_y) in zip(mins, maxs)
+                ],
+                facecolor="#f8f9fa",
+                linestyle="solid",
+                edgecolor="#6c757d",
+                alpha=0.2,
+                linewidth=3,
+            )
+        )
+
+        for vpc_id, (min_x, min_y), (max_x, max_y) in zip(vpc_groups, mins, maxs):
+            # Add VPC label
+            plt.text(
+                min_x + (max_x - min_x) / 2,
+                max_y + 0.2,
+                f"VPC: {vpc_id}",
+                horizontalalignment="center",
+                verticalalignment="bottom",
+                fontsize=12,
+                fontweight="bold",
+                bbox={
+                    "facecolor": "white",
+                    "edgecolor": "none",
+                    "alpha": 0.7,
+                    "pad": 3,
+                },
+            )
 
     def _draw_nodes(self) -> None:
         """Draw all nodes with proper styling."""
         if not self.pos:
-            self.pos = nx.spring_layout(self.graph, k=3, iterations=50)
-
-        sg_nodes = [
-            n
-            for n, attr in self.graph.nodes(data=True)
-            if attr.get("type") == "security_group"
-        ]
-
-        # Regular security group nodes
-        regular_nodes = [
-            n for n in sg_nodes if not self.graph.nodes[n].get("is_highlighted")
-        ]
+            self.pos = self.compute_layout(k=3, iterations=50)
+
+        # Node types were partitioned when the graph was frozen
+        regular_nodes, highlighted_nodes = self._sg_nodes, []
+        cidr_nodes = self._cidr_nodes
+        if self.graph.nodes.get(self.highlight_sg, {}).get("is_highlighted"):
+            highlighted_nodes = [self.highlight_sg]
+            regular_nodes = [n for n in regular_nodes if n != self.highlight_sg]
+
+        # Regular security group nodes. node_size is an area, so scaling it
+        # by the member count of an aggregated node grows its diameter by
+        # sqrt(count), as in the Plotly renderer
         if regular_nodes:
-            nx.draw_networkx_nodes(
+            counts = np.fromiter(
+                (self.graph.nodes[n].get("count", 1) for n in regular_nodes),
+                dtype=np.float64,
+                count=len(regular_nodes),
+            )
+            collection = nx.draw_networkx_nodes(
                 self.graph,
                 self.pos,
                 nodelist=regular_nodes,
-                node_color="#5B9BD5",
-                node_size=self.node_size * 1.2,
+                node_color=COLORS["security_group"],
+                node_size=self.node_size * 1.2 * counts,
                 alpha=0.8,
             )
+            self._rasterize(collection)
 
         # Highlighted security group node
-        highlighted_nodes = [
-            n for n in sg_nodes if self.graph.nodes[n].get("is_highlighted")
-        ]
         if highlighted_nodes:
-            nx.draw_networkx_nodes(
+            collection = nx.draw_networkx_nodes(
                 self.graph,
                 self.pos,
                 nodelist=highlighted_nodes,
-                node_color="#FF6B6B",
+                node_color=COLORS["highlighted"],
                 node_size=self.node_size * 1.5,
                 alpha=1.0,
             )
+            self._rasterize(collection)
 
         # CIDR nodes
-        cidr_nodes = [
-            n for n, attr in self.graph.nodes(data=True) if attr.get("type") == "cidr"
-        ]
         if cidr_nodes:
-            nx.draw_networkx_nodes(
+            collection = nx.draw_networkx_nodes(
                 self.graph,
                 self.pos,
                 nodelist=cidr_nodes,
-                node_color="#70AD47",
+                node_color=COLORS["cidr"],
                 node_shape="s",
                 node_size=self.node_size,
                 alpha=0.7,
             )
+            self._rasterize(collection)
 
     def _draw_edges(self) -> None:
         """Draw edges with proper styling."""
+        self._edge_labels = {}
         if not self.graph.edges():
             return
 
         if not self.pos:
-            self.pos = nx.spring_layout(self.graph, k=3, iterations=50)
-
-        cross_vpc_edges = [
-            (u, v)
-            for u, v, d in self.graph.edges(data=True)
-            if d.get("is_cross_vpc", False)
-        ]
-        normal_edges = [
-            (u, v)
-            for u, v, d in self.graph.edges(data=True)
-            if not d.get("is_cross_vpc", False)
-        ]
+            self.pos = self.compute_layout(k=3, iterations=50)
+
+        # Partition edges and collect their labels in a single pass. Labels
+        # are the only place a PNG shows protocols and ports, so they are
+        # dropped only when max_edge_labels is set and exceeded
+        show_labels = (
+            not self.max_edge_labels
+            or self.graph.number_of_edges() <= self.max_edge_labels
+        )
+        cross_vpc_edges, normal_edges = [], []
+        for u, v, d in self.graph.edges(data=True):
+            if d.get("is_cross_vpc", False):
+                cross_vpc_edges.append((u, v))
+            else:
+                normal_edges.append((u, v))
+            if show_labels and "label" in d:
+                self._edge_labels[(u, v)] = d["label"]
 
         if normal_edges:
-            nx.draw_networkx_edges(
+            edges = nx.draw_networkx_edges(
                 self.graph,
                 self.pos,
                 edgelist=normal_edges,
-                edge_color="#404040",
+                edge_color=COLORS["same_vpc_edge"],
                 width=self.edge_width * 1.2,
                 arrowsize=25,
                 alpha=0.7,
             )
+            self._rasterize(edges)
 
         if cross_vpc_edges:
-            nx.draw_networkx_edges(
+            edges = nx.draw_networkx_edges(
                 self.graph,
                 self.pos,
                 edgelist=cross_vpc_edges,
-                edge_color="#FF6B6B",
+                edge_color=COLORS["cross_vpc_edge"],
                 width=self.edge_width * 1.5,
                 arrowsize=30,
                 style="dashed",
                 alpha=0.8,
             )
+            self._rasterize(edges)
 
     def _draw_labels(self) -> None:
         """Draw node and edge labels."""
         if not self.pos:
-            self.pos = nx.spring_layout(self.graph, k=3, iterations=50)
+            self.pos = self.compute_layout(k=3, iterations=50)
 
         # Node labels
         labels = {}
-        for node in self.graph.nodes():
-            node_data = self.graph.nodes[node]
+        for node, node_data in self.graph.nodes(data=True):
             if node_data.get("type") == "security_group":
                 name = node_data.get("name", str(node))
                 desc = node_data.get("description", "")
@@ -278,7 +260,8 @@ class MatplotlibVisualizer(BaseVisualizer):
         )
 
         # Edge labels
-        edge_labels = nx.get_edge_attributes(self.graph, "label")
+        # Labels were collected while drawing the edges
+        edge_labels = self._edge_labels
         if edge_labels:
             nx.draw_networkx_edge_labels(
                 self.graph,
@@ -294,13 +277,15 @@ class MatplotlibVisualizer(BaseVisualizer):
 
     def _add_legend(self) -> None:
         """Add a legend to the visualization."""
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
         legend_elements = [
             plt.Line2D(
                 [0],
                 [0],
                 marker="o",
                 color="w",
-                markerfacecolor="#5B9BD5",
+                markerfacecolor=COLORS["security_group"],
                 markersize=15,
                 label="Security Groups",
             ),
@@ -309,15 +294,21 @@ class MatplotlibVisualizer(BaseVisualizer):
                 [0],
                 marker="s",
                 color="w",
-                markerfacecolor="#70AD47",
+                markerfacecolor=COLORS["cidr"],
                 markersize=15,
                 label="CIDR Blocks",
             ),
-            plt.Line2D([0], [0], color="#404040", lw=2, label="Same VPC Reference"),
             plt.Line2D(
                 [0],
                 [0],
-                color="#FF6B6B",
+                color=COLORS["same_vpc_edge"],
+                lw=2,
+                label="Same VPC Reference",
+            ),
+            plt.Line2D(
+                [0],
+                [0],
+                color=COLORS["cross_vpc_edge"],
                 lw=2,
                 linestyle="--",
                 label="Cross-VPC Reference",
@@ -341,7 +332,7 @@ class MatplotlibVisualizer(BaseVisualizer):
                     [0],
                     marker="o",
                     color="w",
-                    markerfacecolor="#FF6B6B",
+                    markerfacecolor=COLORS["highlighted"],
                     markersize=15,
                     label="Target Security Group",
                 ),
@@ -356,36 +347,47 @@ class MatplotlibVisualizer(BaseVisualizer):
 
     def generate_visualization(
         self, output_path: str, title: Optional[str] = None
-    ) -> None:
-        """Generate and save the graph visualization using matplotlib."""
+    ) -> Optional[str]:
+        """Generate and save the graph visualization using matplotlib.
+
+        Returns:
+            Optional[str]: Path of the written file, None for an empty graph
+        """
         if not self.graph.nodes():
             logger.warning("No nodes in graph to visualize")
-            return
+            return None
 
-        try:
-            plt.figure(figsize=(20, 20))
+        # matplotlib is slow to import, so only load it when this engine is used
+        import matplotlib  # pylint: disable=import-outside-toplevel
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
 
-            # Create spring layout if not already set
-            if not self.pos:
-                self.pos = nx.spring_layout(self.graph, k=3, iterations=50)
-
-            self._draw_vpc_groups()
-            self._draw_nodes()
-            self._draw_edges()
-            self._draw_labels()
-            self._add_legend()
-
-            # Set title
-            if title:
-                plt.title(title, fontsize=16, pad=20)
-            else:
-                plt.title("AWS Security Group Relationships", fontsize=16, pad=20)
-
-            plt.axis("off")
-            plt.savefig(output_path, dpi=300, bbox_inches="tight")
-            plt.close()
+        try:
+            # Scoped, so other matplotlib users in the process keep their settings
+            with matplotlib.rc_context(_RC_PARAMS):
+                plt.figure(figsize=(20, 20))
+
+                # Create spring layout if not already set
+                if not self.pos:
+                    self.pos = self.compute_layout(k=3, iterations=50)
+
+                self._draw_vpc_groups()
+                self._draw_nodes()
+                self._draw_edges()
+                self._draw_labels()
+                self._add_legend()
+
+                # Set title
+                if title:
+                    plt.title(title, fontsize=16, pad=20)
+                else:
+                    plt.title("AWS Security Group Relationships", fontsize=16, pad=20)
+
+                plt.axis("off")
+                plt.savefig(output_path, dpi=300, bbox_inches="tight")
+                plt.close()
 
             logger.info("Graph visualization saved to %s", output_path)
+            return output_path
         except Exception as e:
             logger.error("Error generating visualization: %s", str(e))
             raise
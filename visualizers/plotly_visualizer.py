@@ -1,11 +1,108 @@
 """Plotly implementation for graph visualization."""
 
-from typing import Optional
-import networkx as nx
-import plotly.graph_objects as go
+import base64
+import gzip
+import hashlib
+from functools import lru_cache
+from typing import IO, Any, Dict, List, Optional
+import numpy as np
 from config import config
 from utils import logger
-from .base import BaseVisualizer
+from .base import COLORS, BaseVisualizer
+
+# Build traces as plain dicts, skipping graph_objects validation. Set to False
+# during development to get validated go.Scatter objects and early errors.
+FAST = True
+
+# Page written around the figure JSON, matching plotly.io.to_html's full page
+_DIV_ID = "awsmap"
+_PAGE_HEAD = f"""<!doctype html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    <style>html, body {{height: 100%;}}</style>
+</head>
+<body>
+<div style="height:100%; width:100%;">
+<script>window.PlotlyConfig = {{MathJaxConfig: 'local'}};</script>
+{{plotlyjs}}
+<div id="{_DIV_ID}" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+<script>
+window.PLOTLYENV = window.PLOTLYENV || {{}};
+var figure = """
+_PAGE_TAIL = f""";
+figure.config = {{"responsive": true}};
+Plotly.newPlot("{_DIV_ID}", figure);
+</script>
+</div>
+</body>
+</html>
+"""
+_WRITE_BUFFER = 1 << 20
+
+
+@lru_cache(maxsize=2)
+def _plotlyjs_tag(embed: bool) -> str:
+    """Return the script tag that loads plotly.js.
+
+    plotly.io.to_html rereads and hashes the bundled plotly.js (about 3 MB) on
+    every call to build the CDN integrity attribute, so this is cached.
+
+    Args:
+        embed: Inline the bundled plotly.js instead of loading it from the CDN
+    """
+    from plotly.offline import (  # pylint: disable=import-outside-toplevel
+        get_plotlyjs,
+        get_plotlyjs_version,
+    )
+
+    plotlyjs = get_plotlyjs()
+    if embed:
+        return f"<script>{plotlyjs}</script>"
+    digest = hashlib.sha256(plotlyjs.encode("utf-8")).digest()
+    return (
+        f'<script charset="utf-8" '
+        f'src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" '
+        f'integrity="sha256-{base64.b64encode(digest).decode("ascii")}" '
+        f'crossorigin="anonymous"></script>'
+    )
+
+
+def _typed_arrays(props: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode NumPy arrays in trace properties as plotly.js typed arrays.
+
+    go.Figure does this during validation. Plain-dict traces skip it, so
+    arrays would otherwise be written as decimal JSON lists.
+
+    Args:
+        props: Trace properties, nested dicts are encoded too
+    """
+    for key, value in props.items():
+        if isinstance(value, np.ndarray) and value.size:
+            value = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+            props[key] = {
+                "dtype": value.dtype.str[1:],
+                "bdata": base64.b64encode(value).decode("ascii"),
+            }
+        elif isinstance(value, dict):
+            _typed_arrays(value)
+    return props
+
+
+def _scatter(use_webgl: bool = False, **kwargs: Any) -> Any:
+    """Create a scatter trace, as a plain dict when FAST is enabled.
+
+    Args:
+        use_webgl: Create a WebGL ``scattergl`` trace instead of SVG ``scatter``
+        **kwargs: Trace properties
+    """
+    if FAST:
+        return _typed_arrays(
+            {"type": "scattergl" if use_webgl else "scatter", **kwargs}
+        )
+    import plotly.graph_objects as go  # pylint: disable=import-outside-toplevel
+
+    return (go.Scattergl if use_webgl else go.Scatter)(**kwargs)
 
 
 class PlotlyVisualizer(BaseVisualizer):
@@ -18,50 +115,263 @@ class PlotlyVisualizer(BaseVisualizer):
         self.node_size = self.settings.get("node_size", 30)
         self.font_size = self.settings.get("font_size", 12)
         self.edge_width = self.settings.get("edge_width", 2)
+        self.embed_plotlyjs = self.settings.get("embed_plotlyjs", False)
+        self.compress_html = self.settings.get("compress_html", False)
+        self.gl_threshold = self.settings.get("gl_threshold", 1000)
+
+    @property
+    def use_webgl(self) -> bool:
+        """Whether traces are drawn with WebGL instead of as SVG elements.
+
+        Large graphs render far faster through WebGL.
+        """
+        return (
+            self.graph.number_of_nodes() + self.graph.number_of_edges()
+            > self.gl_threshold
+        )
+
+    def _create_edge_traces(self, coords: np.ndarray) -> List:
+        """Create batched edge traces, one set per edge class.
+
+        Same-VPC and cross-VPC edges each become a single line trace, with
+        segments separated by ``NaN``, plus a single marker trace of arrows at
+        the edge midpoints that also carries the hover data.
+
+        Args:
+            coords: (n, 2) float32 array of node positions in graph node order
+
+        Returns:
+            List: Edge traces
+        """
+        if self._edge_src.size == 0:
+            return []
+
+        # Endpoints come from the arrays frozen by build_graph
+        src = self._edge_src
+        dst = self._edge_dst
+        is_cross = self._edge_is_cross_vpc
+
+        # Hover values per edge; the surrounding text lives in the hovertemplate
+        names = [name or n for n, name in self.graph.nodes(data="name")]
+        hover_data = [
+            (names[u], names[v], label)
+            for u, v, label in zip(src.tolist(), dst.tolist(), self._edge_label)
+        ]
+
+        p_src = coords[src]
+        p_dst = coords[dst]
+        p_mid = (p_src + p_dst) * 0.5
+        delta = p_dst - p_src
+        # Marker angles are clockwise, arrow-right points along +x
+        angles = np.rint(-np.degrees(np.arctan2(delta[:, 1], delta[:, 0])))
+        angles = angles.astype(np.int16)
+
+        # Indexed by is_cross_vpc, bound once outside the loop
+        edge_colors = (COLORS["same_vpc_edge"], COLORS["cross_vpc_edge"])
+        vpc_html = ("Same VPC Connection", "Cross-VPC Connection")
+        edge_width = self.edge_width
+
+        traces = []
+        for is_cross_vpc, mask in ((False, ~is_cross), (True, is_cross)):
+            segments = int(mask.sum())
+            if not segments:
+                continue
+            # (x0, x1, NaN) per edge; NaN breaks the line like None, but keeps
+            # the polyline a numeric array that is sent as a typed array
+            gap = np.full(segments, np.nan, dtype=coords.dtype)
+            xs = np.stack((p_src[mask, 0], p_dst[mask, 0], gap), axis=1).ravel()
+            ys = np.stack((p_src[mask, 1], p_dst[mask, 1], gap), axis=1).ravel()
+
+            edge_style = {"color": edge_colors[is_cross_vpc], "width": edge_width}
+            if is_cross_vpc:
+                edge_style["dash"] = "dash"
+            traces.append(
+                _scatter(
+                    self.use_webgl,
+                    x=xs,
+                    y=ys,
+                    mode="lines",
+                    line=edge_style,
+                    hoverinfo="skip",
+                    showlegend=False,
+                )
+            )
+            traces.append(
+                _scatter(
+                    self.use_webgl,
+                    x=p_mid[mask, 0],
+                    y=p_mid[mask, 1],
+                    mode="markers",
+                    marker={
+                        # WebGL has no arrow symbols, triangles rotate the same way
+                        "symbol": "triangle-right" if self.use_webgl else "arrow-right",
+                        "size": edge_width * 5,
+                        "angle": angles[mask],
+                        "color": edge_style["color"],
+                    },
+                    customdata=[hover_data[i] for i in np.flatnonzero(mask)],
+                    hovertemplate=(
+                        "Connection Details:<br>From: %{customdata[0]}<br>"
+                        "To: %{customdata[1]}<br>Rule: %{customdata[2]}<br>"
+                        f"{vpc_html[is_cross_vpc]}<extra></extra>"
+                    ),
+                    showlegend=False,
+                )
+            )
+        return traces
+
+    def _create_node_traces(self, node_idx: Dict[str, int], coords: np.ndarray) -> List:
+        """Create one trace per node type (security groups, CIDR blocks).
+
+        Args:
+            node_idx: Mapping of node IDs to rows of ``coords``
+            coords: (n, 2) float32 array of node positions
+
+        Returns:
+            List: Node traces
+        """
+        # Parallel flat lists per node type, filled in a single pass
+        sg_rows, sg_text, sg_hover, sg_count = [], [], [], []
+        cidr_rows, cidr_text, cidr_hover = [], [], []
+        highlighted = None
+        for n, attr in self.graph.nodes(data=True):
+            node_type = attr.get("type")
+            if node_type == "security_group":
+                sg_rows.append(node_idx[n])
+                sg_text.append(attr.get("name", n))
+                sg_count.append(attr.get("count", 1))
+                if attr.get("is_highlighted"):
+                    highlighted = len(sg_rows) - 1
+                sg_hover.append(
+                    "<br>".join(
+                        (
+                            attr.get("name", ""),
+                            n,
+                            attr.get("description", ""),
+                            f"VPC: {attr.get('vpc_id', 'N/A')}",
+                        )
+                    )
+                )
+            elif node_type == "cidr":
+                cidr_rows.append(node_idx[n])
+                cidr_text.append(attr.get("name", n))
+                cidr_hover.append(n)
+
+        traces = []
+        if sg_rows:
+            sg_coords = coords[sg_rows]
+            # Aggregated groups grow with the number of groups they stand for
+            sg_size = (
+                self.node_size * np.sqrt(np.asarray(sg_count, dtype=np.float32))
+                if self._full_graph is not None
+                else self.node_size
+            )
+            sg_color = COLORS["security_group"]
+            # The highlighted group stays in this trace, styled per point
+            if highlighted is not None:
+                sg_color = [sg_color] * len(sg_rows)
+                sg_color[highlighted] = COLORS["highlighted"]
+                sg_size = np.broadcast_to(sg_size, len(sg_rows)).astype(np.float32)
+                sg_size[highlighted] *= 1.25
+            traces.append(
+                _scatter(
+                    self.use_webgl,
+                    x=sg_coords[:, 0],
+                    y=sg_coords[:, 1],
+                    mode="markers+text",
+                    marker={"size": sg_size, "color": sg_color},
+                    text=sg_text,
+                    textposition="bottom center",
+                    textfont={"size": self.font_size},
+                    hovertext=sg_hover,
+                    hoverinfo="text",
+                    name="Security Groups",
+                )
+            )
+
+        if cidr_rows:
+            cidr_coords = coords[cidr_rows]
+            traces.append(
+                _scatter(
+                    self.use_webgl,
+                    x=cidr_coords[:, 0],
+                    y=cidr_coords[:, 1],
+                    mode="markers+text",
+                    marker={
+                        "size": self.node_size,
+                        "color": COLORS["cidr"],
+                        "symbol": "square",
+                    },
+                    text=cidr_text,
+                    textposition="bottom center",
+                    textfont={"size": self.font_size},
+                    hovertext=cidr_hover,
+                    hoverinfo="text",
+                    name="CIDR Blocks",
+                )
+            )
+        return traces
 
     def generate_visualization(
         self, output_path: str, title: Optional[str] = None
-    ) -> None:
-        """Generate and save the graph visualization using Plotly."""
+    ) -> Optional[str]:
+        """Generate and save the graph visualization using Plotly.
+
+        Returns:
+            Optional[str]: Path of the written file, None for an empty graph
+        """
         if not self.graph.nodes():
             logger.warning("No nodes in graph to visualize")
-            return
+            return None
+
+        # Plotly is slow to import, so only load it when rendering
+        import plotly.io as pio  # pylint: disable=import-outside-toplevel
 
         try:
             # Create a spring layout
-            pos = nx.spring_layout(self.graph, k=2)
-
-            # Create figure
-            fig = go.Figure()
-
-            # Add edges
-            for edge in self.graph.edges(data=True):
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                is_cross_vpc = edge[2].get("is_cross_vpc", False)
-
-                # Add edge trace
-                edge_style = (
-                    {"color": "#FF6B6B", "width": self.edge_width, "dash": "dash"}
-                    if is_cross_vpc
-                    else {"color": "#404040", "width": self.edge_width}
-                )
+            pos = self.compute_layout(k=2)
+            node_idx, coords = self.layout_arrays(pos)
 
-                fig.add_trace(
-                    go.Scatter(
-                        x=[x0, x1, None],
-                        y=[y0, y1, None],
-                        mode="lines",
-                        line=edge_style,
-                        hoverinfo="text",
-                        text=edge[2].get("label", ""),
-                        showlegend=False,
-                    )
-                )
+            # Collect traces first so the figure is built once
+            traces = self._create_edge_traces(coords)
+            traces += self._create_node_traces(node_idx, coords)
+            # A plain layout dict avoids go.Layout's per-property validation
+            hidden_axis = {
+                "showgrid": False,
+                "zeroline": False,
+                "showticklabels": False,
+            }
+            layout = {
+                "title": {"text": title or "AWS Security Group Relationships"},
+                "showlegend": True,
+                "hovermode": "closest",
+                "xaxis": hidden_axis,
+                "yaxis": hidden_axis,
+                # go.Figure would apply the default template, so keep the look
+                "template": pio.templates[pio.templates.default].to_plotly_json(),
+            }
+            # Serialize the figure dict directly, without building a go.Figure
+            figure_json = pio.to_json(
+                {"data": traces, "layout": layout}, validate=not FAST
+            )
 
-            # Save the figure
-            fig.write_html(output_path)
+            # Write the page around the JSON in pieces instead of building and
+            # holding a second, complete HTML string
+            if self.compress_html:
+                output_path = f"{output_path}.gz"
+                f: IO[str] = gzip.open(
+                    output_path, "wt", encoding="utf-8", compresslevel=6
+                )
+            else:
+                f = open(output_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER)
+            with f:
+                f.write(
+                    _PAGE_HEAD.replace("{plotlyjs}", _plotlyjs_tag(self.embed_plotlyjs))
+                )
+                f.write(figure_json)
+                f.write(_PAGE_TAIL)
             logger.info("Graph visualization saved to %s", output_path)
+            return output_path
 
         except Exception as e:
             logger.error("Error generating visualization: %s", str(e))